@@ -2,13 +2,21 @@
 Main Flask application for RedShift Chatbot.
 """
 
+import hashlib
 import logging
-from datetime import datetime
-from flask import Flask, request, jsonify, render_template
-from flask_cors import CORS
+import threading
+import time
+from cachetools import TTLCache
+from flask import Flask, Response, request, render_template
+import orjson
 
 from config import Config
-from modules import QueryGenerator, generate_conversation_id
+from modules import (
+    QueryGenerator,
+    generate_conversation_id,
+    normalize_question,
+    now_iso,
+)
 
 # Configure logging
 logging.basicConfig(
@@ -19,14 +27,35 @@ logger = logging.getLogger(__name__)
 
 # Initialize Flask app
 app = Flask(__name__)
-CORS(app)
+
+# CORS headers added to every response (replaces flask-cors)
+_CORS_HEADERS = {
+    'Access-Control-Allow-Origin': Config.CORS_ORIGIN,
+    'Access-Control-Allow-Headers': 'Content-Type',
+    'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
+}
+
+
+@app.before_request
+def _cors_preflight():
+    """Answer CORS preflight requests without routing them."""
+    if request.method == 'OPTIONS':
+        return Response(status=204)
+
+
+@app.after_request
+def _cors(response):
+    """Add CORS headers to the response."""
+    response.headers.update(_CORS_HEADERS)
+    return response
+
 
 # Validate configuration
 try:
     Config.validate_config()
     logger.info("Configuration validated successfully")
 except ValueError as e:
-    logger.error(f"Configuration error: {e}")
+    logger.error("Configuration error: %s", e)
     raise
 
 # Initialize query generator
@@ -34,14 +63,112 @@ try:
     query_generator = QueryGenerator()
     logger.info("Query generator initialized")
 except Exception as e:
-    logger.error(f"Failed to initialize query generator: {e}")
+    logger.error("Failed to initialize query generator: %s", e)
     query_generator = None
 
+# Cache of successful answers keyed by normalized question text
+_response_cache = TTLCache(maxsize=1024, ttl=Config.QUERY_CACHE_TTL)
+_response_cache_lock = threading.Lock()
+
+
+def _response_cache_key(message):
+    """Build the response cache key for a user message."""
+    return hashlib.blake2b(
+        normalize_question(message).encode(),
+        digest_size=16
+    ).digest()
+
+
+# Health body used while the query generator is unavailable; only the
+# timestamp changes between probes
+_UNHEALTHY_BODY_TMPL = orjson.dumps({
+    'status': 'unhealthy',
+    'bedrock': 'unavailable',
+    'redshift': 'unavailable',
+    'error': 'Query generator not initialized',
+})[:-1] + b',"timestamp":"%s"}'
+
+# Pre-serialized schema payload: (etag, body, expiry)
+SCHEMA_CACHE_TTL = 600  # 10 minutes
+_schema_payload = None
+
+# Rendered index page: (etag, body), built on first request
+_index_page = None
+
+# Constant bodies for the 404/500 error handlers
+_NOT_FOUND_BODY = b'{"error":"Not found"}'
+_INTERNAL_ERROR_BODY = b'{"error":"Internal server error"}'
+
+
+def _json_response(obj, status=200):
+    """
+    Build a JSON response using orjson instead of Flask's stdlib encoder.
+    
+    Args:
+        obj: JSON-serializable object (Decimal and other types fall back
+            to str)
+        status: HTTP status code
+        
+    Returns:
+        Response: Compact application/json response
+    """
+    return Response(
+        orjson.dumps(
+            obj,
+            default=str,
+            option=orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+        ),
+        status=status,
+        mimetype='application/json'
+    )
+
+
+def _parse_json_body():
+    """
+    Parse the request body as a JSON object using orjson.
+    
+    The raw body is read without caching since it is only parsed once.
+    
+    Returns:
+        dict: Parsed body, or None if the body is missing, not JSON,
+            or not a JSON object
+    """
+    if not request.is_json:
+        return None
+    
+    raw = request.get_data(cache=False)
+    if not raw:
+        return None
+    
+    try:
+        data = orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        return None
+    
+    return data if isinstance(data, dict) else None
+
 
 @app.route('/')
 def index():
-    """Serve the main chat interface."""
-    return render_template('index.html')
+    """
+    Serve the main chat interface.
+    
+    The page is static, so it is rendered once (on every request in debug
+    mode) and served with an ETag for conditional requests.
+    """
+    global _index_page
+    
+    if _index_page is None or app.debug:
+        body = render_template('index.html').encode()
+        _index_page = (f'"{hashlib.md5(body).hexdigest()}"', body)
+    
+    etag, body = _index_page
+    headers = {'ETag': etag, 'Cache-Control': 'public, max-age=3600'}
+    
+    if request.headers.get('If-None-Match') == etag:
+        return Response(status=304, headers=headers)
+    
+    return Response(body, mimetype='text/html', headers=headers)
 
 
 @app.route('/api/chat', methods=['POST'])
@@ -67,19 +194,26 @@ def chat():
     """
     try:
         # Parse request
-        data = request.get_json()
+        data = _parse_json_body()
+        
+        if data is None:
+            return _json_response({
+                'error': 'Request body must be a JSON object'
+            }, 400)
         
-        if not data or 'message' not in data:
-            return jsonify({
+        user_message = data.get('message')
+        
+        if user_message is None:
+            return _json_response({
                 'error': 'Missing required field: message'
-            }), 400
+            }, 400)
         
-        user_message = data['message'].strip()
+        user_message = user_message.strip()
         
         if not user_message:
-            return jsonify({
+            return _json_response({
                 'error': 'Message cannot be empty'
-            }), 400
+            }, 400)
         
         # Get or create conversation ID
         conversation_id = data.get('conversation_id')
@@ -87,22 +221,36 @@ def chat():
             conversation_id = generate_conversation_id()
         
         logger.info(
-            f"Processing query - "
-            f"conversation_id: {conversation_id}, "
-            f"message: {user_message}"
+            "Processing query - conversation_id: %s, message: %s",
+            conversation_id,
+            user_message
         )
         
         # Check if query generator is available
         if not query_generator:
-            return jsonify({
+            return _json_response({
                 'error': 'Service unavailable - database connection failed'
-            }), 503
+            }, 503)
         
-        # Generate and execute query
-        result = query_generator.generate_and_execute(
-            user_message,
-            conversation_context={'conversation_id': conversation_id}
-        )
+        # Serve repeated questions from cache, skipping Bedrock and RedShift
+        start_time = time.time()
+        cache_key = _response_cache_key(user_message)
+        with _response_cache_lock:
+            result = _response_cache.get(cache_key)
+        cache_status = 'HIT' if result is not None else 'MISS'
+        
+        if result is not None:
+            # Report this request's time, not the original run's
+            result = {**result, 'execution_time': time.time() - start_time}
+        else:
+            # Generate and execute query
+            result = query_generator.generate_and_execute(
+                user_message,
+                conversation_context={'conversation_id': conversation_id}
+            )
+            if not result['error']:
+                with _response_cache_lock:
+                    _response_cache[cache_key] = result
         
         # Prepare response
         response_data = {
@@ -112,23 +260,27 @@ def chat():
             'conversation_id': conversation_id,
             'execution_time': round(result['execution_time'], 2),
             'error': result['error'],
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': now_iso()
         }
         
         logger.info(
-            f"Query completed - "
-            f"conversation_id: {conversation_id}, "
-            f"execution_time: {result['execution_time']:.2f}s"
+            "Query completed - conversation_id: %s, "
+            "execution_time: %.2fs, cache: %s",
+            conversation_id,
+            result['execution_time'],
+            cache_status
         )
         
-        return jsonify(response_data), 200
+        response = _json_response(response_data)
+        response.headers['X-Cache'] = cache_status
+        return response, 200
         
     except Exception as e:
-        logger.error(f"Error processing chat request: {e}")
-        return jsonify({
+        logger.error("Error processing chat request: %s", e)
+        return _json_response({
             'error': 'Internal server error',
             'message': str(e)
-        }), 500
+        }, 500)
 
 
 @app.route('/api/health', methods=['GET'])
@@ -147,13 +299,11 @@ def health():
     try:
         # Check if query generator is available
         if not query_generator:
-            return jsonify({
-                'status': 'unhealthy',
-                'bedrock': 'unavailable',
-                'redshift': 'unavailable',
-                'error': 'Query generator not initialized',
-                'timestamp': datetime.utcnow().isoformat()
-            }), 503
+            return Response(
+                _UNHEALTHY_BODY_TMPL % now_iso().encode(),
+                status=503,
+                mimetype='application/json'
+            )
         
         # Test connections
         connection_status = query_generator.test_connections()
@@ -164,7 +314,7 @@ def health():
             else 'degraded'
         )
         
-        return jsonify({
+        return _json_response({
             'status': overall_status,
             'bedrock': (
                 'connected' if connection_status['bedrock'] else 'error'
@@ -172,16 +322,16 @@ def health():
             'redshift': (
                 'connected' if connection_status['redshift'] else 'error'
             ),
-            'timestamp': datetime.utcnow().isoformat()
-        }), 200
+            'timestamp': now_iso()
+        }, 200)
         
     except Exception as e:
-        logger.error(f"Health check failed: {e}")
-        return jsonify({
+        logger.error("Health check failed: %s", e)
+        return _json_response({
             'status': 'unhealthy',
             'error': str(e),
-            'timestamp': datetime.utcnow().isoformat()
-        }), 503
+            'timestamp': now_iso()
+        }, 503)
 
 
 @app.route('/api/schema', methods=['GET'])
@@ -201,34 +351,63 @@ def schema():
         ]
     }
     """
+    global _schema_payload
+    
     try:
         if not query_generator:
-            return jsonify({
+            return _json_response({
                 'error': 'Service unavailable - database connection failed'
-            }), 503
+            }, 503)
+        
+        # Serialize once and reuse until expiry; schemas rarely change
+        if _schema_payload is None or _schema_payload[2] < time.time():
+            schema_info = query_generator.get_schema()
+            body = orjson.dumps(schema_info, default=str)
+            if not schema_info.get('tables'):
+                # Don't pin a failed/empty schema fetch in the cache
+                return Response(body, status=200, mimetype='application/json')
+            etag = f'"{hashlib.md5(body).hexdigest()}"'
+            _schema_payload = (etag, body, time.time() + SCHEMA_CACHE_TTL)
+        
+        etag, body, _ = _schema_payload
+        headers = {
+            'ETag': etag,
+            'Cache-Control': f'max-age={SCHEMA_CACHE_TTL}'
+        }
+        
+        if request.headers.get('If-None-Match') == etag:
+            return Response(status=304, headers=headers)
         
-        schema_info = query_generator.get_schema()
-        return jsonify(schema_info), 200
+        return Response(
+            body,
+            status=200,
+            mimetype='application/json',
+            headers=headers
+        )
         
     except Exception as e:
-        logger.error(f"Schema retrieval failed: {e}")
-        return jsonify({
+        logger.error("Schema retrieval failed: %s", e)
+        return _json_response({
             'error': 'Failed to retrieve schema',
             'message': str(e)
-        }), 500
+        }, 500)
 
 
 @app.errorhandler(404)
 def not_found(error):
     """Handle 404 errors."""
-    return jsonify({'error': 'Not found'}), 404
+    return Response(_NOT_FOUND_BODY, status=404, mimetype='application/json')
 
 
 @app.errorhandler(500)
 def internal_error(error):
     """Handle 500 errors."""
-    logger.error(f"Internal server error: {error}")
-    return jsonify({'error': 'Internal server error'}), 500
+    logger.error("Internal server error: %s", error)
+    return Response(
+        _INTERNAL_ERROR_BODY,
+        status=500,
+        mimetype='application/json'
+    )
 
 
 # Cleanup on shutdown
@@ -236,12 +415,12 @@ def internal_error(error):
 def cleanup(exception=None):
     """Clean up resources on app context teardown."""
     if exception:
-        logger.error(f"App context teardown with exception: {exception}")
+        logger.error("App context teardown with exception: %s", exception)
 
 
 if __name__ == '__main__':
     try:
-        logger.info(f"Starting Flask app on port {Config.PORT}")
+        logger.info("Starting Flask app on port %s", Config.PORT)
         app.run(
             host='0.0.0.0',
             port=Config.PORT,
@@ -251,5 +430,5 @@ if __name__ == '__main__':
         logger.info("Shutting down application")
         query_generator.close()
     except Exception as e:
-        logger.error(f"Application error: {e}")
+        logger.error("Application error: %s", e)
         raise
\ No newline at end of file
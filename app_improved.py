@@ -2,10 +2,10 @@
 Main Flask application for RedShift Chatbot with enhanced configuration.
 """
 
+import hashlib
 import logging
-from datetime import datetime
-from flask import Flask, request, jsonify, render_template
-from flask_cors import CORS
+from flask import Flask, Response, request, render_template
+import orjson
 
 # Import improved config if available, fallback to original
 try:
@@ -15,7 +15,7 @@ except ImportError:
     from config import Config
     print("Using standard configuration")
 
-from modules import QueryGenerator, generate_conversation_id
+from modules import QueryGenerator, generate_conversation_id, now_iso
 
 # Configure logging
 logging.basicConfig(
@@ -26,7 +26,28 @@ logger = logging.getLogger(__name__)
 
 # Initialize Flask app
 app = Flask(__name__)
-CORS(app)
+
+# CORS headers added to every response (replaces flask-cors)
+_CORS_HEADERS = {
+    'Access-Control-Allow-Origin': Config.CORS_ORIGIN,
+    'Access-Control-Allow-Headers': 'Content-Type',
+    'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
+}
+
+
+@app.before_request
+def _cors_preflight():
+    """Answer CORS preflight requests without routing them."""
+    if request.method == 'OPTIONS':
+        return Response(status=204)
+
+
+@app.after_request
+def _cors(response):
+    """Add CORS headers to the response."""
+    response.headers.update(_CORS_HEADERS)
+    return response
+
 
 # Validate configuration
 try:
@@ -36,10 +57,10 @@ try:
     # Log deployment info if available
     if hasattr(Config, 'get_deployment_info'):
         deployment_info = Config.get_deployment_info()
-        logger.info(f"Deployment info: {deployment_info}")
+        logger.info("Deployment info: %s", deployment_info)
         
 except ValueError as e:
-    logger.error(f"Configuration error: {e}")
+    logger.error("Configuration error: %s", e)
     raise
 
 # Initialize query generator
@@ -47,14 +68,86 @@ try:
     query_generator = QueryGenerator()
     logger.info("Query generator initialized")
 except Exception as e:
-    logger.error(f"Failed to initialize query generator: {e}")
+    logger.error("Failed to initialize query generator: %s", e)
     query_generator = None
 
+# Rendered index page: (etag, body), built on first request
+_index_page = None
+
+# Constant bodies for the 404/500 error handlers
+_NOT_FOUND_BODY = b'{"error":"Not found"}'
+_INTERNAL_ERROR_BODY = b'{"error":"Internal server error"}'
+
+
+def _json_response(obj, status=200):
+    """
+    Build a JSON response using orjson instead of Flask's stdlib encoder.
+    
+    Args:
+        obj: JSON-serializable object (Decimal and other types fall back
+            to str)
+        status: HTTP status code
+        
+    Returns:
+        Response: Compact application/json response
+    """
+    return Response(
+        orjson.dumps(
+            obj,
+            default=str,
+            option=orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+        ),
+        status=status,
+        mimetype='application/json'
+    )
+
+
+def _parse_json_body():
+    """
+    Parse the request body as a JSON object using orjson.
+    
+    The raw body is read without caching since it is only parsed once.
+    
+    Returns:
+        dict: Parsed body, or None if the body is missing, not JSON,
+            or not a JSON object
+    """
+    if not request.is_json:
+        return None
+    
+    raw = request.get_data(cache=False)
+    if not raw:
+        return None
+    
+    try:
+        data = orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        return None
+    
+    return data if isinstance(data, dict) else None
+
 
 @app.route('/')
 def index():
-    """Serve the main chat interface."""
-    return render_template('index.html')
+    """
+    Serve the main chat interface.
+    
+    The page is static, so it is rendered once (on every request in debug
+    mode) and served with an ETag for conditional requests.
+    """
+    global _index_page
+    
+    if _index_page is None or app.debug:
+        body = render_template('index.html').encode()
+        _index_page = (f'"{hashlib.md5(body).hexdigest()}"', body)
+    
+    etag, body = _index_page
+    headers = {'ETag': etag, 'Cache-Control': 'public, max-age=3600'}
+    
+    if request.headers.get('If-None-Match') == etag:
+        return Response(status=304, headers=headers)
+    
+    return Response(body, mimetype='text/html', headers=headers)
 
 
 @app.route('/api/chat', methods=['POST'])
@@ -76,35 +169,37 @@ def chat():
         "results": "query results (if applicable)"
     }
     """
+    # Parse the body and resolve the conversation ID once; every branch
+    # below reuses them
+    data = _parse_json_body() or {}
+    conversation_id = data.get('conversation_id') or generate_conversation_id()
+    
     try:
         if not query_generator:
-            return jsonify({
+            return _json_response({
                 'error': 'Query generator not available',
-                'conversation_id': request.json.get('conversation_id', generate_conversation_id())
-            }), 503
+                'conversation_id': conversation_id
+            }, 503)
         
-        data = request.get_json()
-        if not data or 'message' not in data:
-            return jsonify({'error': 'Message is required'}), 400
+        user_message = data.get('message')
+        if user_message is None:
+            return _json_response({'error': 'Message is required'}, 400)
         
-        user_message = data['message']
-        conversation_id = data.get('conversation_id', generate_conversation_id())
-        
-        logger.info(f"Processing message for conversation {conversation_id}: {user_message[:100]}...")
+        logger.info("Processing message for conversation %s: %.100s...", conversation_id, user_message)
         
         # Process the message
         response = query_generator.process_message(user_message, conversation_id)
         
-        logger.info(f"Response generated for conversation {conversation_id}")
+        logger.info("Response generated for conversation %s", conversation_id)
         
-        return jsonify(response)
+        return _json_response(response)
         
     except Exception as e:
-        logger.error(f"Error processing chat message: {e}")
-        return jsonify({
+        logger.error("Error processing chat message: %s", e)
+        return _json_response({
             'error': 'Internal server error',
-            'conversation_id': request.json.get('conversation_id', generate_conversation_id()) if request.json else generate_conversation_id()
-        }), 500
+            'conversation_id': conversation_id
+        }, 500)
 
 
 @app.route('/api/health', methods=['GET'])
@@ -128,14 +223,14 @@ def health():
                 'bedrock': 'unavailable',
                 'redshift': 'unavailable',
                 'error': 'Query generator not initialized',
-                'timestamp': datetime.utcnow().isoformat()
+                'timestamp': now_iso()
             }
             
             # Add deployment info if available
             if hasattr(Config, 'get_deployment_info'):
                 response['deployment'] = Config.get_deployment_info()
             
-            return jsonify(response), 503
+            return _json_response(response, 503)
         
         # Test connections
         connection_status = query_generator.test_connections()
@@ -150,7 +245,7 @@ def health():
             'status': overall_status,
             'bedrock': 'connected' if connection_status.get('bedrock', False) else 'disconnected',
             'redshift': 'connected' if connection_status.get('redshift', False) else 'disconnected',
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': now_iso()
         }
         
         # Add deployment info if available
@@ -158,14 +253,14 @@ def health():
             response['deployment'] = Config.get_deployment_info()
         
         status_code = 200 if overall_status == 'healthy' else 503
-        return jsonify(response), status_code
+        return _json_response(response, status_code)
         
     except Exception as e:
-        logger.error(f"Health check failed: {e}")
+        logger.error("Health check failed: %s", e)
         response = {
             'status': 'unhealthy',
             'error': str(e),
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': now_iso()
         }
         
         # Add deployment info if available
@@ -175,7 +270,7 @@ def health():
             except:
                 pass
         
-        return jsonify(response), 503
+        return _json_response(response, 503)
 
 
 @app.route('/api/info', methods=['GET'])
@@ -188,7 +283,7 @@ def deployment_info():
         info = {
             'application': 'RedShift Chatbot',
             'version': '1.0.0',
-            'timestamp': datetime.utcnow().isoformat(),
+            'timestamp': now_iso(),
             'flask_env': Config.FLASK_ENV,
             'environment': getattr(Config, 'ENVIRONMENT', 'unknown')
         }
@@ -210,27 +305,31 @@ def deployment_info():
         else:
             info['services'] = {'status': 'unavailable'}
         
-        return jsonify(info)
+        return _json_response(info)
         
     except Exception as e:
-        logger.error(f"Info endpoint failed: {e}")
-        return jsonify({
+        logger.error("Info endpoint failed: %s", e)
+        return _json_response({
             'error': str(e),
-            'timestamp': datetime.utcnow().isoformat()
-        }), 500
+            'timestamp': now_iso()
+        }, 500)
 
 
 @app.errorhandler(404)
 def not_found(error):
     """Handle 404 errors."""
-    return jsonify({'error': 'Not found'}), 404
+    return Response(_NOT_FOUND_BODY, status=404, mimetype='application/json')
 
 
 @app.errorhandler(500)
 def internal_error(error):
     """Handle 500 errors."""
-    logger.error(f"Internal server error: {error}")
-    return jsonify({'error': 'Internal server error'}), 500
+    logger.error("Internal server error: %s", error)
+    return Response(
+        _INTERNAL_ERROR_BODY,
+        status=500,
+        mimetype='application/json'
+    )
 
 
 if __name__ == '__main__':
@@ -4,45 +4,47 @@ Loads and validates environment variables.
 """
 
 import os
-import boto3
-from dotenv import load_dotenv
+import json
+import stat
+import time
 
-# Load environment variables from .env file
-load_dotenv()
+from config_base import _BaseConfig, SSM_PARAM_MAP
 
+# SSM parameter path and local cache used to skip the network on restarts
+SSM_PATH = '/finchat/'
+SSM_CACHE_FILE = os.getenv('SSM_CACHE_FILE', '/tmp/finchat-ssm.json')
+SSM_CACHE_TTL = 300  # 5 minutes
 
-class Config:
+# Instance metadata service endpoint (link-local, only reachable on EC2)
+IMDS_URL = 'http://169.254.169.254/latest'
+
+# Cached EC2 detection result. AWS compute runtimes advertise themselves
+# through the environment; otherwise IMDS is probed on first check.
+_IS_EC2 = (
+    True
+    if os.getenv('AWS_EXECUTION_ENV')
+    or os.getenv('ECS_CONTAINER_METADATA_URI')
+    else None
+)
+
+
+def _probe_ec2():
+    """Probe IMDSv2 for a session token; only EC2 hosts answer."""
+    try:
+        import requests
+        response = requests.put(
+            f'{IMDS_URL}/api/token',
+            headers={'X-aws-ec2-metadata-token-ttl-seconds': '60'},
+            timeout=0.1
+        )
+        return response.status_code == 200
+    except Exception:
+        return False
+
+
+class Config(_BaseConfig):
     """Application configuration class."""
     
-    # AWS Configuration
-    AWS_REGION = os.getenv('AWS_REGION', 'us-east-1')
-    AWS_ACCESS_KEY_ID = os.getenv('AWS_ACCESS_KEY_ID')
-    AWS_SECRET_ACCESS_KEY = os.getenv('AWS_SECRET_ACCESS_KEY')
-    
-    # Bedrock Configuration
-    BEDROCK_MODEL_ID = os.getenv(
-        'BEDROCK_MODEL_ID',
-        'anthropic.claude-3-5-sonnet-20241022-v2:0'
-    )
-    BEDROCK_MAX_TOKENS = int(os.getenv('BEDROCK_MAX_TOKENS', '4096'))
-    BEDROCK_TEMPERATURE = float(os.getenv('BEDROCK_TEMPERATURE', '0.0'))
-    
-    # RedShift Configuration
-    REDSHIFT_HOST = os.getenv('REDSHIFT_HOST')
-    REDSHIFT_PORT = int(os.getenv('REDSHIFT_PORT', '5439'))
-    REDSHIFT_DATABASE = os.getenv('REDSHIFT_DATABASE')
-    REDSHIFT_USER = os.getenv('REDSHIFT_USER')
-    REDSHIFT_PASSWORD = os.getenv('REDSHIFT_PASSWORD')
-    REDSHIFT_SSL = os.getenv('REDSHIFT_SSL', 'True').lower() == 'true'
-    REDSHIFT_SCHEMA = os.getenv('REDSHIFT_SCHEMA', 'public')
-    
-    # Application Configuration
-    FLASK_ENV = os.getenv('FLASK_ENV', 'development')
-    FLASK_DEBUG = os.getenv('FLASK_DEBUG', 'True').lower() == 'true'
-    PORT = int(os.getenv('PORT', '5000'))
-    MAX_QUERY_TIMEOUT = int(os.getenv('MAX_QUERY_TIMEOUT', '30'))
-    MAX_RESULT_ROWS = int(os.getenv('MAX_RESULT_ROWS', '1000'))
-    
     @staticmethod
     def validate_config():
         """
@@ -87,70 +89,124 @@ class Config:
     
     @staticmethod
     def _is_ec2_instance():
-        """Check if running on EC2 instance."""
-        try:
-            import requests
-            response = requests.get(
-                'http://169.254.169.254/latest/meta-data/instance-id',
-                timeout=2
-            )
-            return response.status_code == 200
-        except:
-            return False
+        """Check if running on EC2 instance (probed once per process)."""
+        global _IS_EC2
+        if _IS_EC2 is None:
+            _IS_EC2 = _probe_ec2()
+        return _IS_EC2
     
     @staticmethod
     def _load_from_ssm():
-        """Load configuration from AWS Systems Manager Parameter Store."""
+        """
+        Load configuration from AWS Systems Manager Parameter Store.
+        
+        Parameters under SSM_PATH are fetched in a single paginated
+        get_parameters_by_path call and persisted to SSM_CACHE_FILE, so
+        worker restarts within SSM_CACHE_TTL skip the network entirely.
+        """
+        if Config._ssm_loaded:
+            return
+        
         try:
-            ssm = boto3.client('ssm', region_name=Config.AWS_REGION)
-            
-            parameters = [
-                '/finchat/aws-access-key-id',
-                '/finchat/aws-secret-access-key',
-                '/finchat/redshift-host',
-                '/finchat/redshift-database',
-                '/finchat/redshift-user',
-                '/finchat/redshift-password'
-            ]
+            values = Config._read_ssm_cache()
             
-            response = ssm.get_parameters(
-                Names=parameters,
-                WithDecryption=True
-            )
+            if values is None:
+                import boto3
+                ssm = boto3.client('ssm', region_name=Config.AWS_REGION)
+                
+                param_map = {
+                    '/finchat/aws-access-key-id': 'AWS_ACCESS_KEY_ID',
+                    '/finchat/aws-secret-access-key': 'AWS_SECRET_ACCESS_KEY',
+                    **SSM_PARAM_MAP
+                }
+                
+                paginator = ssm.get_paginator('get_parameters_by_path')
+                pages = paginator.paginate(
+                    Path=SSM_PATH,
+                    Recursive=True,
+                    WithDecryption=True
+                )
+                present = {
+                    param['Name']: param['Value']
+                    for page in pages
+                    for param in page['Parameters']
+                }
+                values = {
+                    param_map[name]: value
+                    for name, value in present.items()
+                    if name in param_map
+                }
+                
+                Config._write_ssm_cache(values)
             
-            param_map = {
-                '/finchat/aws-access-key-id': 'AWS_ACCESS_KEY_ID',
-                '/finchat/aws-secret-access-key': 'AWS_SECRET_ACCESS_KEY',
-                '/finchat/redshift-host': 'REDSHIFT_HOST',
-                '/finchat/redshift-database': 'REDSHIFT_DATABASE',
-                '/finchat/redshift-user': 'REDSHIFT_USER',
-                '/finchat/redshift-password': 'REDSHIFT_PASSWORD'
-            }
+            for env_var, value in values.items():
+                setattr(Config, env_var, value)
             
-            for param in response['Parameters']:
-                env_var = param_map.get(param['Name'])
-                if env_var:
-                    setattr(Config, env_var, param['Value'])
+            Config._ssm_loaded = True
                     
         except Exception as e:
             print(f"Warning: Could not load from SSM: {e}")
     
     @staticmethod
-    def get_redshift_connection_string():
+    def _read_ssm_cache():
         """
-        Get RedShift connection string.
+        Read SSM parameters from the local cache file if still fresh.
+        
+        The file is only trusted if it is a regular file owned by this
+        user and not accessible to anyone else, since it lives in a
+        shared directory and holds credentials.
         
         Returns:
-            str: Database connection string.
+            dict: Cached parameter values, or None on miss/expiry.
         """
-        return (
-            f"host={Config.REDSHIFT_HOST} "
-            f"port={Config.REDSHIFT_PORT} "
-            f"dbname={Config.REDSHIFT_DATABASE} "
-            f"user={Config.REDSHIFT_USER} "
-            f"password={Config.REDSHIFT_PASSWORD} "
-            f"sslmode={'require' if Config.REDSHIFT_SSL else 'prefer'}"
-        )
+        try:
+            fd = os.open(SSM_CACHE_FILE, os.O_RDONLY | os.O_NOFOLLOW)
+        except OSError:
+            return None
+        
+        try:
+            st = os.fstat(fd)
+            if (
+                not stat.S_ISREG(st.st_mode)
+                or st.st_uid != os.getuid()
+                or st.st_mode & 0o077
+                or time.time() - st.st_mtime > SSM_CACHE_TTL
+            ):
+                return None
+            with os.fdopen(fd, 'r') as f:
+                fd = None
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+        finally:
+            if fd is not None:
+                os.close(fd)
+    
+    @staticmethod
+    def _write_ssm_cache(values):
+        """
+        Persist SSM parameter values to the local cache file (0600).
+        
+        The values are written to a new private file and renamed into
+        place, so an existing file owned by someone else is never
+        written to.
+        """
+        tmp_path = f"{SSM_CACHE_FILE}.{os.getpid()}.tmp"
+        try:
+            fd = os.open(
+                tmp_path,
+                os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_NOFOLLOW,
+                0o600
+            )
+            with os.fdopen(fd, 'w') as f:
+                json.dump(values, f)
+            os.replace(tmp_path, SSM_CACHE_FILE)
+        except OSError as e:
+            print(f"Warning: Could not write SSM cache: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
     
     @staticmethod
     def get_aws_credentials():
@@ -0,0 +1,150 @@
+"""
+Shared configuration base for RedShift Chatbot application.
+Parses environment variables once for both config.py and config_iam.py.
+"""
+
+import os
+
+# Load environment variables from .env file (set SKIP_DOTENV=1 to skip)
+if os.getenv('SKIP_DOTENV') != '1':
+    from dotenv import load_dotenv
+    load_dotenv()
+
+# SSM parameter name -> Config attribute for the RedShift settings
+SSM_PARAM_MAP = {
+    '/finchat/redshift-host': 'REDSHIFT_HOST',
+    '/finchat/redshift-database': 'REDSHIFT_DATABASE',
+    '/finchat/redshift-user': 'REDSHIFT_USER',
+    '/finchat/redshift-password': 'REDSHIFT_PASSWORD'
+}
+
+
+class _BaseConfig:
+    """Environment-derived settings shared by all Config variants."""
+    
+    # AWS Configuration
+    AWS_REGION = os.getenv('AWS_REGION', 'us-east-1')
+    AWS_ACCESS_KEY_ID = os.getenv('AWS_ACCESS_KEY_ID')
+    AWS_SECRET_ACCESS_KEY = os.getenv('AWS_SECRET_ACCESS_KEY')
+    
+    # Bedrock Configuration
+    BEDROCK_MODEL_ID = os.getenv(
+        'BEDROCK_MODEL_ID',
+        'anthropic.claude-3-5-sonnet-20241022-v2:0'
+    )
+    BEDROCK_MAX_TOKENS = int(os.getenv('BEDROCK_MAX_TOKENS', '4096'))
+    BEDROCK_TEMPERATURE = float(os.getenv('BEDROCK_TEMPERATURE', '0.0'))
+    # Only enable for models on Bedrock's prompt caching list; others
+    # reject cache_control with a ValidationException
+    BEDROCK_PROMPT_CACHING = (
+        os.getenv('BEDROCK_PROMPT_CACHING', 'False').lower() == 'true'
+    )
+    BEDROCK_MAX_CONCURRENCY = int(os.getenv('BEDROCK_MAX_CONCURRENCY', '8'))
+    BEDROCK_EMBEDDING_MODEL_ID = os.getenv(
+        'BEDROCK_EMBEDDING_MODEL_ID',
+        'amazon.titan-embed-text-v2:0'
+    )
+    
+    # RedShift Configuration
+    REDSHIFT_HOST = os.getenv('REDSHIFT_HOST')
+    REDSHIFT_PORT = int(os.getenv('REDSHIFT_PORT', '5439'))
+    REDSHIFT_DATABASE = os.getenv('REDSHIFT_DATABASE')
+    REDSHIFT_USER = os.getenv('REDSHIFT_USER')
+    REDSHIFT_PASSWORD = os.getenv('REDSHIFT_PASSWORD')
+    REDSHIFT_SSL = os.getenv('REDSHIFT_SSL', 'True').lower() == 'true'
+    REDSHIFT_SCHEMA = os.getenv('REDSHIFT_SCHEMA', 'public')
+    
+    # Application Configuration
+    FLASK_ENV = os.getenv('FLASK_ENV', 'development')
+    FLASK_DEBUG = os.getenv('FLASK_DEBUG', 'True').lower() == 'true'
+    PORT = int(os.getenv('PORT', '5000'))
+    MAX_QUERY_TIMEOUT = int(os.getenv('MAX_QUERY_TIMEOUT', '30'))
+    MAX_RESULT_ROWS = int(os.getenv('MAX_RESULT_ROWS', '1000'))
+    QUERY_CACHE_TTL = int(os.getenv('QUERY_CACHE_TTL', '300'))
+    CORS_ORIGIN = os.getenv('CORS_ORIGIN', '*')
+    REDSHIFT_POOL_MIN = int(os.getenv('REDSHIFT_POOL_MIN', '2'))
+    REDSHIFT_POOL_MAX = int(os.getenv('REDSHIFT_POOL_MAX', '20'))
+    HEALTH_TIMEOUT = float(os.getenv('HEALTH_TIMEOUT', '5'))
+    SEMANTIC_CACHE_ENABLED = (
+        os.getenv('SEMANTIC_CACHE_ENABLED', 'False').lower() == 'true'
+    )
+    SEMANTIC_CACHE_THRESHOLD = float(
+        os.getenv('SEMANTIC_CACHE_THRESHOLD', '0.92')
+    )
+    SEMANTIC_CACHE_TTL = int(os.getenv('SEMANTIC_CACHE_TTL', '300'))
+    SCHEMA_MAX_TABLES = int(os.getenv('SCHEMA_MAX_TABLES', '15'))
+    SQL_CACHE_TTL = int(os.getenv('SQL_CACHE_TTL', '60'))
+    WARMUP_ON_START = os.getenv('WARMUP_ON_START', 'True').lower() == 'true'
+    SCHEMA_CACHE_DIR = os.getenv('SCHEMA_CACHE_DIR', '/tmp')
+    SCHEMA_CACHE_DISK_TTL = int(os.getenv('SCHEMA_CACHE_DISK_TTL', '86400'))
+    
+    # Runtime flags
+    _ssm_loaded = False
+    _pool = None
+    
+    @classmethod
+    def get_redshift_connection_string(cls):
+        """
+        Get RedShift connection string.
+        
+        Returns:
+            str: Database connection string.
+        """
+        return (
+            f"host={cls.REDSHIFT_HOST} "
+            f"port={cls.REDSHIFT_PORT} "
+            f"dbname={cls.REDSHIFT_DATABASE} "
+            f"user={cls.REDSHIFT_USER} "
+            f"password={cls.REDSHIFT_PASSWORD} "
+            f"sslmode={'require' if cls.REDSHIFT_SSL else 'prefer'}"
+        )
+    
+    @classmethod
+    def get_redshift_connection_params(cls):
+        """
+        Get RedShift connection parameters.
+        
+        Returns:
+            dict: Keyword arguments for psycopg2.connect().
+        """
+        return {
+            'host': cls.REDSHIFT_HOST,
+            'port': cls.REDSHIFT_PORT,
+            'database': cls.REDSHIFT_DATABASE,
+            'user': cls.REDSHIFT_USER,
+            'password': cls.REDSHIFT_PASSWORD,
+            'sslmode': 'require' if cls.REDSHIFT_SSL else 'prefer',
+            'connect_timeout': 10,
+            # Default per-query timeout, set once per session
+            'options': (
+                f"-c statement_timeout={cls.MAX_QUERY_TIMEOUT * 1000}"
+            ),
+        }
+    
+    @classmethod
+    def get_redshift_pool(cls):
+        """
+        Get the process-wide RedShift connection pool, creating it on
+        first use.
+        
+        Callers borrow connections with getconn() and return them with
+        putconn() instead of connecting per request.
+        
+        Returns:
+            psycopg2.pool.ThreadedConnectionPool: Shared connection pool.
+        """
+        if cls._pool is None:
+            from psycopg2 import pool
+            cls._pool = pool.ThreadedConnectionPool(
+                minconn=cls.REDSHIFT_POOL_MIN,
+                maxconn=cls.REDSHIFT_POOL_MAX,
+                **cls.get_redshift_connection_params()
+            )
+        return cls._pool
+    
+    @classmethod
+    def close_redshift_pool(cls):
+        """Close all connections in the shared RedShift pool."""
+        if cls._pool is not None:
+            cls._pool.closeall()
+            cls._pool = None
@@ -3,51 +3,47 @@ Enhanced configuration module for RedShift Chatbot application.
 Prioritizes IAM roles over access keys for better security.
 """
 
+import functools
 import os
-import boto3
-import requests
-from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
+from config_base import _BaseConfig, SSM_PARAM_MAP
 
+# Instance metadata service endpoint (link-local, only reachable on EC2)
+IMDS_URL = 'http://169.254.169.254/latest'
 
-class Config:
+# Per-process client cache, so each service client (and its connection
+# pool) is built once
+_clients = {}
+
+
+def _get_client(service_name):
+    """Get a cached boto3 client for the given service."""
+    client = _clients.get(service_name)
+    if client is None:
+        import boto3
+        from botocore.config import Config as BotoConfig
+        
+        client = boto3.client(
+            service_name,
+            config=BotoConfig(
+                max_pool_connections=50,
+                retries={'max_attempts': 2, 'mode': 'standard'}
+            ),
+            **Config.get_aws_credentials()
+        )
+        _clients[service_name] = client
+    return client
+
+
+class Config(_BaseConfig):
     """Application configuration class with IAM role support."""
     
-    # AWS Configuration
-    AWS_REGION = os.getenv('AWS_REGION', 'us-east-1')
-    AWS_ACCESS_KEY_ID = os.getenv('AWS_ACCESS_KEY_ID')
-    AWS_SECRET_ACCESS_KEY = os.getenv('AWS_SECRET_ACCESS_KEY')
-    
-    # Bedrock Configuration
-    BEDROCK_MODEL_ID = os.getenv(
-        'BEDROCK_MODEL_ID',
-        'anthropic.claude-3-5-sonnet-20241022-v2:0'
-    )
-    BEDROCK_MAX_TOKENS = int(os.getenv('BEDROCK_MAX_TOKENS', '4096'))
-    BEDROCK_TEMPERATURE = float(os.getenv('BEDROCK_TEMPERATURE', '0.0'))
-    
-    # RedShift Configuration
-    REDSHIFT_HOST = os.getenv('REDSHIFT_HOST')
-    REDSHIFT_PORT = int(os.getenv('REDSHIFT_PORT', '5439'))
-    REDSHIFT_DATABASE = os.getenv('REDSHIFT_DATABASE')
-    REDSHIFT_USER = os.getenv('REDSHIFT_USER')
-    REDSHIFT_PASSWORD = os.getenv('REDSHIFT_PASSWORD')
-    REDSHIFT_SSL = os.getenv('REDSHIFT_SSL', 'True').lower() == 'true'
-    REDSHIFT_SCHEMA = os.getenv('REDSHIFT_SCHEMA', 'public')
-    
-    # Application Configuration
-    FLASK_ENV = os.getenv('FLASK_ENV', 'development')
-    FLASK_DEBUG = os.getenv('FLASK_DEBUG', 'True').lower() == 'true'
-    PORT = int(os.getenv('PORT', '5000'))
-    MAX_QUERY_TIMEOUT = int(os.getenv('MAX_QUERY_TIMEOUT', '30'))
-    MAX_RESULT_ROWS = int(os.getenv('MAX_RESULT_ROWS', '1000'))
     ENVIRONMENT = os.getenv('ENVIRONMENT', 'development')
     
     # Runtime flags
     _is_ec2 = None
-    _ssm_loaded = False
+    _instance_id = None
+    _availability_zone = None
     
     @staticmethod
     def validate_config():
@@ -86,25 +82,54 @@ class Config:
     
     @staticmethod
     def is_ec2_instance():
-        """Check if running on EC2 instance with caching."""
+        """
+        Check if running on EC2 instance with caching.
+        
+        AWS compute runtimes are detected from the environment; otherwise
+        IMDSv2 is probed once and the instance metadata used by
+        get_deployment_info() is captured in the same pass.
+        """
         if Config._is_ec2 is None:
+            if (
+                os.getenv('AWS_EXECUTION_ENV')
+                or os.getenv('ECS_CONTAINER_METADATA_URI')
+            ):
+                Config._is_ec2 = True
+                return Config._is_ec2
+            
             try:
-                response = requests.get(
-                    'http://169.254.169.254/latest/meta-data/instance-id',
-                    timeout=2
+                import requests
+                token = requests.put(
+                    f'{IMDS_URL}/api/token',
+                    headers={'X-aws-ec2-metadata-token-ttl-seconds': '60'},
+                    timeout=0.1
                 )
-                Config._is_ec2 = response.status_code == 200
+                Config._is_ec2 = token.status_code == 200
             except:
                 Config._is_ec2 = False
+            
+            if Config._is_ec2:
+                headers = {'X-aws-ec2-metadata-token': token.text}
+                try:
+                    Config._instance_id = requests.get(
+                        f'{IMDS_URL}/meta-data/instance-id',
+                        headers=headers,
+                        timeout=2
+                    ).text
+                    Config._availability_zone = requests.get(
+                        f'{IMDS_URL}/meta-data/placement/availability-zone',
+                        headers=headers,
+                        timeout=2
+                    ).text
+                except:
+                    pass
         return Config._is_ec2
     
     @staticmethod
     def _test_aws_access():
         """Test AWS access with current configuration."""
         try:
-            credentials = Config.get_aws_credentials()
-            sts = boto3.client('sts', **credentials)
-            sts.get_caller_identity()
+            _get_client('sts').get_caller_identity()
             return True
         except Exception as e:
             raise Exception(f"Cannot access AWS: {e}")
@@ -116,20 +141,10 @@ class Config:
             return
             
         try:
-            # Use IAM role credentials if on EC2
-            if Config.is_ec2_instance():
-                ssm = boto3.client('ssm', region_name=Config.AWS_REGION)
-            else:
-                credentials = Config.get_aws_credentials()
-                ssm = boto3.client('ssm', **credentials)
+            # Uses IAM role credentials if on EC2
+            ssm = _get_client('ssm')
             
-            # Parameter mapping
-            param_map = {
-                '/finchat/redshift-host': 'REDSHIFT_HOST',
-                '/finchat/redshift-database': 'REDSHIFT_DATABASE',
-                '/finchat/redshift-user': 'REDSHIFT_USER',
-                '/finchat/redshift-password': 'REDSHIFT_PASSWORD'
-            }
+            param_map = SSM_PARAM_MAP
             
             # Get all parameters at once
             try:
@@ -138,17 +153,17 @@ class Config:
                     WithDecryption=True
                 )
                 
-                for param in response['Parameters']:
-                    env_var = param_map.get(param['Name'])
-                    if env_var:
-                        setattr(Config, env_var, param['Value'])
-                        print(f"Loaded {env_var} from SSM")
+                present = {
+                    p['Name']: p['Value'] for p in response['Parameters']
+                }
+                for name, value in present.items():
+                    env_var = param_map[name]
+                    # Set on the shared base so config.Config sees it too
+                    setattr(_BaseConfig, env_var, value)
+                    print(f"Loaded {env_var} from SSM")
                 
                 # Check for missing parameters
-                missing_params = []
-                for param_name in param_map.keys():
-                    if not any(p['Name'] == param_name for p in response['Parameters']):
-                        missing_params.append(param_name)
+                missing_params = [n for n in param_map if n not in present]
                 
                 if missing_params:
                     print(f"Warning: Missing SSM parameters: {missing_params}")
@@ -159,22 +174,11 @@ class Config:
                 print(f"Warning: Could not load from SSM: {e}")
             
             Config._ssm_loaded = True
+            Config._compute_deployment_info.cache_clear()
                     
         except Exception as e:
             print(f"Warning: Could not load from SSM: {e}")
     
-    @staticmethod
-    def get_redshift_connection_string():
-        """Get RedShift connection string."""
-        return (
-            f"host={Config.REDSHIFT_HOST} "
-            f"port={Config.REDSHIFT_PORT} "
-            f"dbname={Config.REDSHIFT_DATABASE} "
-            f"user={Config.REDSHIFT_USER} "
-            f"password={Config.REDSHIFT_PASSWORD} "
-            f"sslmode={'require' if Config.REDSHIFT_SSL else 'prefer'}"
-        )
-    
     @staticmethod
     def get_aws_credentials():
         """
@@ -202,7 +206,17 @@ class Config:
     
     @staticmethod
     def get_deployment_info():
-        """Get deployment information for debugging."""
+        """
+        Get deployment information for debugging.
+        
+        The information is computed once per process; callers get a copy.
+        """
+        return dict(Config._compute_deployment_info())
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def _compute_deployment_info():
+        """Build the deployment info dict (cleared when SSM loads)."""
         info = {
             'environment': Config.ENVIRONMENT,
             'is_ec2': Config.is_ec2_instance(),
@@ -213,22 +227,10 @@ class Config:
             'ssm_loaded': Config._ssm_loaded
         }
         
-        if Config.is_ec2_instance():
-            try:
-                # Get instance metadata
-                instance_id = requests.get(
-                    'http://169.254.169.254/latest/meta-data/instance-id',
-                    timeout=2
-                ).text
-                availability_zone = requests.get(
-                    'http://169.254.169.254/latest/meta-data/placement/availability-zone',
-                    timeout=2
-                ).text
-                info.update({
-                    'instance_id': instance_id,
-                    'availability_zone': availability_zone
-                })
-            except:
-                pass
+        if Config.is_ec2_instance() and Config._instance_id:
+            info.update({
+                'instance_id': Config._instance_id,
+                'availability_zone': Config._availability_zone
+            })
         
         return info
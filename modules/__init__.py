@@ -7,9 +7,15 @@ from .redshift_client import RedShiftClient
 from .query_generator import QueryGenerator
 from .utils import (
     format_query_results,
+    format_query_results_batched,
+    format_query_results_columnar,
     generate_conversation_id,
+    iter_query_results,
+    normalize_question,
+    now_iso,
     sanitize_sql,
     log_error,
+    log_errors_batch,
 )
 
 __all__ = [
@@ -17,7 +23,13 @@ __all__ = [
     'RedShiftClient',
     'QueryGenerator',
     'format_query_results',
+    'format_query_results_batched',
+    'format_query_results_columnar',
     'generate_conversation_id',
+    'iter_query_results',
+    'normalize_question',
+    'now_iso',
     'sanitize_sql',
     'log_error',
+    'log_errors_batch',
 ]
\ No newline at end of file
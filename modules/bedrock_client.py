@@ -2,16 +2,112 @@
 AWS Bedrock client for interacting with Claude 3.5 Sonnet.
 """
 
-import json
+import functools
 import logging
-from typing import Dict, Any
+import re
+import threading
+from contextlib import closing
+from typing import Dict, Any, Iterator, List, Optional, Union
 import boto3
+from botocore.config import Config as BotoConfig
 from botocore.exceptions import ClientError
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    import json
+
 from config import Config
 
 logger = logging.getLogger(__name__)
 
+# Markdown code fence around a model reply, e.g. ```sql ... ```; the
+# closing fence may be missing when a streamed reply is cut short
+_FENCE_RE = re.compile(
+    r'^```(?:[A-Za-z]*[ \t]*\n)?(.*?)(?:\n?```)?\s*$',
+    re.DOTALL
+)
+
+# Words in identifiers and questions, used to match tables to a question
+_WORD_RE = re.compile(r'[a-z0-9]+')
+
+
+def _words(text: str) -> set:
+    """
+    Split text into lowercase words, adding singular forms of plurals.
+    
+    Args:
+        text: Question or identifier text
+    
+    Returns:
+        set: Words, e.g. 'customer_names' -> {'customer', 'names', 'name'}
+    """
+    words = set(_WORD_RE.findall(text.lower()))
+    for word in list(words):
+        if len(word) > 3 and word.endswith('ies'):
+            words.add(word[:-3] + 'y')
+        elif len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+            words.add(word[:-1])
+    return words
+
+
+# Caps in-flight Bedrock calls per process to stay under account quotas
+_bedrock_slots = threading.BoundedSemaphore(Config.BEDROCK_MAX_CONCURRENCY)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_bedrock_client():
+    """
+    Get the process-wide bedrock-runtime client, creating it on first use.
+    
+    Building a boto3 client parses the service model, so it is done once
+    and shared by every BedrockClient. The connection pool is sized for
+    concurrent requests from gevent workers.
+    
+    Returns:
+        botocore.client.BaseClient: bedrock-runtime client
+    """
+    return boto3.client(
+        service_name='bedrock-runtime',
+        config=BotoConfig(
+            max_pool_connections=50,
+            retries={'mode': 'adaptive', 'max_attempts': 3},
+            tcp_keepalive=True
+        ),
+        **Config.get_aws_credentials()
+    )
+
+
+def _dumps(obj: Any) -> str:
+    """
+    Serialize to compact JSON, using orjson when available.
+    
+    Args:
+        obj: Object to serialize (unsupported types fall back to str)
+        
+    Returns:
+        str: JSON text
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=str).decode()
+    return json.dumps(obj, default=str)
+
+
+def _loads(data: Union[bytes, str]) -> Any:
+    """
+    Parse JSON, using orjson when available.
+    
+    Args:
+        data: JSON document
+        
+    Returns:
+        Parsed object
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
 
 class BedrockClient:
     """Client for AWS Bedrock service to interact with Claude models."""
@@ -19,13 +115,16 @@ class BedrockClient:
     def __init__(self):
         """Initialize Bedrock client with AWS credentials."""
         try:
-            self.client = boto3.client(
-                service_name='bedrock-runtime',
-                **Config.get_aws_credentials()
-            )
+            self.client = _get_bedrock_client()
             self.model_id = Config.BEDROCK_MODEL_ID
             self.max_tokens = Config.BEDROCK_MAX_TOKENS
             self.temperature = Config.BEDROCK_TEMPERATURE
+            self._sql_static_prompt = self._build_sql_static_prompt()
+            # id(schema_info) -> (schema_info, schema_text), FIFO-capped
+            self._schema_text_cache = {}
+            # (schema_info, [(word set, rendered line) per table]) for the
+            # last schema seen
+            self._table_index = (None, [])
             logger.info("Bedrock client initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize Bedrock client: {e}")
@@ -52,7 +151,23 @@ class BedrockClient:
         prompt = self._build_sql_generation_prompt(user_query, schema_info)
         
         try:
-            response = self._invoke_model(prompt)
+            # Ignore text after the statement terminator (a semicolon
+            # outside a string literal). The stream is still drained
+            # rather than closed early: closing it drops the keep-alive
+            # connection, and the terminator is almost always the last
+            # token anyway.
+            response = ''
+            terminated = False
+            with closing(self._invoke_model_stream(prompt)) as stream:
+                for text in stream:
+                    if terminated:
+                        continue
+                    start = len(response)
+                    response += text
+                    end = response.find(';', start)
+                    if end != -1 and response.count("'", 0, end) % 2 == 0:
+                        response = response[:end + 1]
+                        terminated = True
             sql = self._extract_sql_from_response(response)
             logger.info(f"Generated SQL: {sql}")
             return sql
@@ -91,22 +206,98 @@ class BedrockClient:
             # Return a basic response if formatting fails
             return self._create_fallback_response(query_results)
     
-    def _invoke_model(self, prompt: str) -> str:
+    def _invoke_model(
+        self,
+        prompt: Union[str, List[Dict[str, Any]]],
+        max_tokens: Optional[int] = None
+    ) -> str:
         """
         Invoke Claude model with the given prompt.
         
         Args:
-            prompt: The prompt to send to Claude
-            
+            prompt: The prompt text, or a list of content blocks
+                (e.g. with cache_control markers)
+            max_tokens: Output token limit (defaults to self.max_tokens)
+        
         Returns:
             str: Model response text
             
         Raises:
             ClientError: If API call fails
         """
-        request_body = {
+        try:
+            with _bedrock_slots:
+                response = self.client.invoke_model(
+                    modelId=self.model_id,
+                    body=self._build_request_body(prompt, max_tokens)
+                )
+                response_body = _loads(response['body'].read())
+            
+            return response_body['content'][0]['text']
+            
+        except ClientError as e:
+            logger.error(f"Bedrock API error: {e}")
+            raise
+    
+    def _invoke_model_stream(
+        self,
+        prompt: Union[str, List[Dict[str, Any]]]
+    ) -> Iterator[str]:
+        """
+        Invoke Claude model and yield the response text as it streams.
+        
+        Reading the stream to the end returns the connection to the
+        pool. Closing the generator early closes the stream and drops
+        the connection, so only do that to abandon a long response.
+        
+        Args:
+            prompt: The prompt text, or a list of content blocks
+            
+        Yields:
+            str: Text deltas in generation order
+            
+        Raises:
+            ClientError: If API call fails
+        """
+        try:
+            with _bedrock_slots:
+                response = self.client.invoke_model_with_response_stream(
+                    modelId=self.model_id,
+                    body=self._build_request_body(prompt)
+                )
+                stream = response['body']
+                try:
+                    for event in stream:
+                        chunk = event.get('chunk')
+                        if not chunk:
+                            continue
+                        payload = _loads(chunk['bytes'])
+                        if payload.get('type') == 'content_block_delta':
+                            yield payload['delta'].get('text', '')
+                finally:
+                    stream.close()
+        except ClientError as e:
+            logger.error(f"Bedrock API error: {e}")
+            raise
+    
+    def _build_request_body(
+        self,
+        prompt: Union[str, List[Dict[str, Any]]],
+        max_tokens: Optional[int] = None
+    ) -> str:
+        """
+        Build the Messages API request body for a single user turn.
+        
+        Args:
+            prompt: The prompt text, or a list of content blocks
+            max_tokens: Output token limit (defaults to self.max_tokens)
+        
+        Returns:
+            str: JSON request body
+        """
+        return _dumps({
             "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": self.max_tokens,
+            "max_tokens": max_tokens or self.max_tokens,
             "temperature": self.temperature,
             "messages": [
                 {
@@ -114,46 +305,181 @@ class BedrockClient:
                     "content": prompt
                 }
             ]
-        }
+        })
+    
+    def warm_up(self, schema_info: Dict[str, Any]) -> None:
+        """
+        Open the Bedrock connection with a one-token request.
         
-        try:
+        When prompt caching is on and the schema is small enough to be
+        sent untrimmed, the request carries the same static and schema
+        blocks as generate_sql so the cached prefix is written. Trimmed
+        prompts vary by question and share no prefix worth priming.
+        
+        Args:
+            schema_info: Database schema
+        """
+        tables = (schema_info or {}).get('tables', [])
+        if (
+            Config.BEDROCK_PROMPT_CACHING
+            and tables
+            and not self._is_trimmed(schema_info)
+        ):
+            prompt = self._build_sql_generation_prompt('', schema_info)
+        else:
+            prompt = 'ping'
+        
+        self._invoke_model(prompt, max_tokens=1)
+    
+    def embed_text(self, text: str) -> List[float]:
+        """
+        Embed text with the configured Titan embedding model.
+        
+        Args:
+            text: Text to embed
+            
+        Returns:
+            list: Unit-normalized embedding vector
+            
+        Raises:
+            ClientError: If API call fails
+        """
+        with _bedrock_slots:
             response = self.client.invoke_model(
-                modelId=self.model_id,
-                body=json.dumps(request_body)
+                modelId=Config.BEDROCK_EMBEDDING_MODEL_ID,
+                body=_dumps({
+                    "inputText": text,
+                    "dimensions": 256,
+                    "normalize": True
+                })
             )
+            return _loads(response['body'].read())['embedding']
+    
+    @staticmethod
+    def _is_trimmed(schema_info: Dict[str, Any]) -> bool:
+        """
+        Check whether prompts for this schema send only selected tables.
+        
+        Args:
+            schema_info: Database schema
             
-            response_body = json.loads(response['body'].read())
-            return response_body['content'][0]['text']
+        Returns:
+            bool: True if the schema has more than SCHEMA_MAX_TABLES tables
+        """
+        tables = (schema_info or {}).get('tables', [])
+        max_tables = Config.SCHEMA_MAX_TABLES
+        return 0 < max_tables < len(tables)
+    
+    def _schema_text_for_query(
+        self,
+        user_query: str,
+        schema_info: Dict[str, Any]
+    ) -> str:
+        """
+        Render the schema, trimmed to the tables most related to the question.
+        
+        Tables are scored by how many words of the question (singular and
+        plural forms alike) appear in the table or column names; the top
+        SCHEMA_MAX_TABLES are kept in their original order. Small schemas,
+        and questions matching nothing, get the full schema. Table lines
+        are rendered once per schema dict and joined per question, and
+        the same selection always yields the same text.
+        
+        Args:
+            user_query: User's question
+            schema_info: Database schema
             
-        except ClientError as e:
-            logger.error(f"Bedrock API error: {e}")
-            raise
+        Returns:
+            str: Schema text for the prompt
+        """
+        if not self._is_trimmed(schema_info):
+            return self._format_schema_info(schema_info)
+        
+        tables = schema_info['tables']
+        max_tables = Config.SCHEMA_MAX_TABLES
+        
+        indexed_schema, entries = self._table_index
+        if indexed_schema is not schema_info:
+            entries = [
+                (
+                    _words(' '.join(
+                        # Drop the schema qualifier ('public.orders'),
+                        # which every table shares
+                        [table['name'].rsplit('.', 1)[-1]]
+                        + [col['name'] for col in table.get('columns', [])]
+                    )),
+                    self._format_table_line(table)
+                )
+                for table in tables
+            ]
+            self._table_index = (schema_info, entries)
+        
+        query_words = _words(user_query)
+        scores = [len(query_words & words) for words, _ in entries]
+        if not any(scores):
+            return self._format_schema_info(schema_info)
+        
+        ranked = sorted(
+            range(len(entries)),
+            key=lambda i: scores[i],
+            reverse=True
+        )[:max_tables]
+        return '\n'.join(entries[i][1] for i in sorted(ranked))
     
     def _build_sql_generation_prompt(
         self,
         user_query: str,
         schema_info: Dict[str, Any]
-    ) -> str:
+    ) -> List[Dict[str, Any]]:
         """
         Build prompt for SQL generation.
         
+        The static instructions and the schema come first and the user
+        request last. With BEDROCK_PROMPT_CACHING enabled and the full
+        schema sent, a cache checkpoint after the schema block covers
+        both, so repeat calls only pay full price for the request itself.
+        Trimmed schemas change per question and get no checkpoint, and
+        the instructions alone are below the minimum cacheable prefix.
+        
         Args:
             user_query: User's question
             schema_info: Database schema
             
         Returns:
-            str: Formatted prompt
+            list: Message content blocks
         """
-        schema_text = self._format_schema_info(schema_info)
+        schema_text = self._schema_text_for_query(user_query, schema_info)
         
-        prompt = (
+        schema_block = {
+            "type": "text",
+            "text": f"Database Schema:\n{schema_text}"
+        }
+        if Config.BEDROCK_PROMPT_CACHING and not self._is_trimmed(schema_info):
+            schema_block["cache_control"] = {"type": "ephemeral"}
+        
+        return [
+            {
+                "type": "text",
+                "text": self._sql_static_prompt
+            },
+            schema_block,
+            {
+                "type": "text",
+                "text": f"User Request: {user_query}"
+            }
+        ]
+    
+    @staticmethod
+    def _build_sql_static_prompt() -> str:
+        """
+        Build the static instructions for SQL generation.
+        
+        Returns:
+            str: Instruction text shared by every SQL generation request
+        """
+        return (
             f"""You are a SQL expert. Generate a valid SQL query """
-            f"""for the following request.
-
-Database Schema:
-{schema_text}
-
-User Request: {user_query}
+            f"""for the user request that follows the database schema.
 
 Rules:
 - Only use SELECT statements (no INSERT, UPDATE, DELETE, DROP)
@@ -167,7 +493,6 @@ Rules:
 Return ONLY the SQL query without any explanation, """
             f"""markdown formatting, or code blocks. Just the raw SQL."""
         )
-        return prompt
     
     def _build_response_formatting_prompt(
         self,
@@ -200,7 +525,7 @@ SQL Query Executed:
 {sql_query}
 
 Query Results ({total_rows} row(s) total):
-{json.dumps(results_sample, indent=2, default=str)}
+{self._format_results_table(results_sample)}
 
 Instructions:
 - Provide a clear, concise explanation of what the data shows
@@ -214,10 +539,60 @@ Format your response in plain text without markdown formatting."""
         )
         return prompt
     
+    @staticmethod
+    def _format_results_table(rows: List[Dict[str, Any]]) -> str:
+        """
+        Format result rows as a pipe-separated table for a prompt.
+        
+        A header line plus one line per row is far shorter (and fewer
+        tokens) than indented JSON repeating every key on every row.
+        
+        Args:
+            rows: Result rows sharing the same columns
+            
+        Returns:
+            str: Table text, or "(no rows)" if empty
+        """
+        if not rows:
+            return "(no rows)"
+        
+        columns = list(rows[0].keys())
+        lines = [' | '.join(columns)]
+        for row in rows:
+            lines.append(' | '.join(
+                ' '.join(str(row.get(col, '')).split())
+                for col in columns
+            ))
+        return '\n'.join(lines)
+    
+    @staticmethod
+    def _format_table_line(table: Dict[str, Any]) -> str:
+        """
+        Format one table of the schema for the prompt.
+        
+        Args:
+            table: Table dictionary with name and columns
+        
+        Returns:
+            str: "name: col (type), ..." or just the name if no columns
+        """
+        columns = table.get('columns', [])
+        if not columns:
+            return table['name']
+        
+        col_definitions = ', '.join(
+            f"{col['name']} ({col['type']})"
+            for col in columns
+        )
+        return f"{table['name']}: {col_definitions}"
+    
     def _format_schema_info(self, schema_info: Dict[str, Any]) -> str:
         """
         Format schema information for prompt.
         
+        QueryGenerator reuses the same schema dict until its cache
+        expires, so the rendered text is memoized per dict object.
+        
         Args:
             schema_info: Schema dictionary
             
@@ -227,21 +602,22 @@ Format your response in plain text without markdown formatting."""
         if not schema_info or 'tables' not in schema_info:
             return "No schema information available"
         
-        schema_lines = []
-        for table in schema_info['tables']:
-            table_name = table['name']
-            columns = table.get('columns', [])
-            
-            if columns:
-                col_definitions = ', '.join([
-                    f"{col['name']} ({col['type']})"
-                    for col in columns
-                ])
-                schema_lines.append(f"{table_name}: {col_definitions}")
-            else:
-                schema_lines.append(table_name)
-        
-        return '\n'.join(schema_lines)
+        key = id(schema_info)
+        cached = self._schema_text_cache.get(key)
+        # Holding the dict in the entry keeps its id from being reused
+        if cached is not None and cached[0] is schema_info:
+            return cached[1]
+        
+        schema_text = '\n'.join(
+            self._format_table_line(table)
+            for table in schema_info['tables']
+        )
+        
+        self._schema_text_cache[key] = (schema_info, schema_text)
+        while len(self._schema_text_cache) > 4:
+            del self._schema_text_cache[next(iter(self._schema_text_cache))]
+        
+        return schema_text
     
     def _extract_sql_from_response(self, response: str) -> str:
         """
@@ -253,19 +629,13 @@ Format your response in plain text without markdown formatting."""
         Returns:
             str: Cleaned SQL query
         """
-        # Remove markdown code blocks if present
+        # Remove markdown code blocks (```sql ... ```) if present
         sql = response.strip()
+        match = _FENCE_RE.match(sql)
+        if match:
+            sql = match.group(1)
         
-        # Remove ```sql and ``` if present
-        if sql.startswith('```'):
-            sql = sql.split('\n', 1)[1] if '\n' in sql else sql
-            if sql.endswith('```'):
-                sql = sql.rsplit('```', 1)[0]
-        
-        # Remove leading/trailing whitespace
-        sql = sql.strip()
-        
-        return sql
+        return sql.strip()
     
     def _create_fallback_response(self, query_results: list) -> str:
         """
@@ -2,44 +2,91 @@
 Query generator module that orchestrates between Bedrock and RedShift.
 """
 
+import hashlib
+import json
 import logging
+import os
+import stat
+import threading
 import time
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, Any, Optional
+from cachetools import TTLCache
 
 from config import Config
 from .bedrock_client import BedrockClient
 from .redshift_client import RedShiftClient
+from .semantic_cache import SemanticCache
 from .utils import (
     sanitize_sql,
     log_error,
+    error_key,
     format_execution_time,
     format_error_message
 )
 
 logger = logging.getLogger(__name__)
 
+# Background workers for I/O that can overlap within a single request
+_prefetch_executor = ThreadPoolExecutor(
+    max_workers=4,
+    thread_name_prefix='finchat-prefetch'
+)
+
+# Set once the first QueryGenerator in this process has started warm-up
+_warmup_started = threading.Event()
+
 
 class QueryGenerator:
     """Orchestrates SQL generation and execution."""
     
     def __init__(self):
         """Initialize query generator with clients."""
+        # In-flight health probe per service, reused while still running
+        self._probes = {}
+        self._probe_lock = threading.Lock()
         try:
             self.bedrock_client = BedrockClient()
             self.redshift_client = RedShiftClient()
             self.schema_cache = None
             self.schema_cache_time = None
+            # Serializes schema refreshes so concurrent cold callers
+            # (warm-up, prefetch, first requests) share one fetch
+            self._schema_lock = threading.Lock()
+            self.format_bypass_hits = 0
+            # SHA-256 of sanitized SQL -> result rows
+            self._sql_cache = TTLCache(maxsize=512, ttl=Config.SQL_CACHE_TTL)
+            self._sql_cache_lock = threading.Lock()
+            self.semantic_cache = (
+                SemanticCache(
+                    threshold=Config.SEMANTIC_CACHE_THRESHOLD,
+                    ttl=Config.SEMANTIC_CACHE_TTL,
+                    max_entries=256
+                )
+                if Config.SEMANTIC_CACHE_ENABLED
+                else None
+            )
             logger.info("QueryGenerator initialized successfully")
+            
+            if Config.WARMUP_ON_START and not _warmup_started.is_set():
+                _warmup_started.set()
+                threading.Thread(
+                    target=self._warmup,
+                    name='finchat-warmup',
+                    daemon=True
+                ).start()
         except Exception as e:
             logger.error(f"Failed to initialize QueryGenerator: {e}")
             # Don't raise - allow partial initialization
             self.bedrock_client = None
             self.redshift_client = None
+            self.semantic_cache = None
     
     def generate_and_execute(
         self,
         user_query: str,
-        conversation_context: Dict[str, Any] = None
+        conversation_context: Dict[str, Any] = None,
+        no_cache: bool = False
     ) -> Dict[str, Any]:
         """
         Main workflow: generate SQL and execute query.
@@ -47,6 +94,7 @@ class QueryGenerator:
         Args:
             user_query: User's natural language question
             conversation_context: Optional conversation context
+            no_cache: Bypass cached answers and query results
             
         Returns:
             Dictionary containing:
@@ -58,9 +106,30 @@ class QueryGenerator:
         """
         start_time = time.time()
         
+        # Answer paraphrases of recently answered questions from cache.
+        # The schema fetch doesn't depend on the embedding call, so it is
+        # started in the background and overlaps with it.
+        embedding = None
+        schema_future = None
+        if self.semantic_cache is not None and not no_cache:
+            schema_future = _prefetch_executor.submit(self._get_schema_info)
+            try:
+                embedding = self.bedrock_client.embed_text(user_query)
+                cached = self.semantic_cache.lookup(embedding)
+                if cached is not None:
+                    return {
+                        **cached,
+                        'execution_time': time.time() - start_time
+                    }
+            except Exception as e:
+                logger.warning(f"Semantic cache lookup failed: {e}")
+        
         try:
             # Get schema information
-            schema_info = self._get_schema_info()
+            if schema_future is not None:
+                schema_info = schema_future.result()
+            else:
+                schema_info = self._get_schema_info()
             
             if not schema_info or not schema_info.get('tables'):
                 return {
@@ -84,16 +153,33 @@ class QueryGenerator:
             # Sanitize SQL
             sql_query = sanitize_sql(sql_query)
             
-            # Execute query
-            logger.info(f"Executing SQL: {sql_query}")
-            results = self.redshift_client.execute_query(sql_query)
+            # Execute query, reusing recent results for identical SQL
+            sql_key = hashlib.sha256(sql_query.encode()).hexdigest()
+            with self._sql_cache_lock:
+                results = None if no_cache else self._sql_cache.get(sql_key)
             
-            # Format response
-            response = self.bedrock_client.format_response(
-                sql_query,
-                results,
-                user_query
-            )
+            if results is not None:
+                logger.info(f"Using cached results for SQL: {sql_query}")
+            else:
+                logger.info(f"Executing SQL: {sql_query}")
+                results = self.redshift_client.execute_query(sql_query)
+                with self._sql_cache_lock:
+                    self._sql_cache[sql_key] = results
+            
+            # Format response; trivial results don't need the model
+            response = self._format_trivial_results(results)
+            if response is not None:
+                self.format_bypass_hits += 1
+                logger.info(
+                    f"Skipped response formatting call "
+                    f"({self.format_bypass_hits} so far)"
+                )
+            else:
+                response = self.bedrock_client.format_response(
+                    sql_query,
+                    results,
+                    user_query
+                )
             
             execution_time = time.time() - start_time
             
@@ -102,7 +188,7 @@ class QueryGenerator:
                 f"{format_execution_time(execution_time)}"
             )
             
-            return {
+            result = {
                 'response': response,
                 'sql_query': sql_query,
                 'results': results,
@@ -110,6 +196,11 @@ class QueryGenerator:
                 'error': None
             }
             
+            if embedding is not None:
+                self.semantic_cache.add(embedding, result)
+            
+            return result
+            
         except ValueError as e:
             # SQL validation error
             error_msg = str(e)
@@ -128,8 +219,13 @@ class QueryGenerator:
             
         except Exception as e:
             # General error
-            log_error(e, {'user_query': user_query})
-            error_msg = format_error_message(e, user_friendly=True)
+            error_type = error_key(e)
+            log_error(e, {'user_query': user_query}, error_type=error_type)
+            error_msg = format_error_message(
+                e,
+                user_friendly=True,
+                error_type=error_type
+            )
             
             return {
                 'response': error_msg,
@@ -139,6 +235,41 @@ class QueryGenerator:
                 'error': str(e)
             }
     
+    def _warmup(self) -> None:
+        """
+        Prime schema, Bedrock connections and the prompt cache.
+        
+        Loads the schema and sends a one-token Bedrock request so the
+        TLS connection (and, if enabled, the cached schema prefix) is
+        ready before the first user question arrives.
+        """
+        try:
+            schema_info = self._get_schema_info()
+            self.bedrock_client.warm_up(schema_info)
+            logger.info("Warm-up completed")
+        except Exception as e:
+            logger.warning(f"Warm-up failed: {e}")
+    
+    @staticmethod
+    def _format_trivial_results(results: list) -> Optional[str]:
+        """
+        Phrase empty or single-value results without calling the model.
+        
+        Args:
+            results: Query results
+            
+        Returns:
+            str: Response text, or None if the results need formatting
+        """
+        if not results:
+            return "No results found for your question."
+        
+        if len(results) == 1 and len(results[0]) == 1:
+            column, value = next(iter(results[0].items()))
+            return f"{column.replace('_', ' ').title()}: {value}"
+        
+        return None
+    
     def _get_schema_info(self) -> Dict[str, Any]:
         """
         Get schema information with caching.
@@ -146,29 +277,146 @@ class QueryGenerator:
         Returns:
             Dictionary containing schema information
         """
+        schema_info = self._fresh_schema_cache()
+        if schema_info is not None:
+            logger.debug("Using cached schema information")
+            return schema_info
+        
+        with self._schema_lock:
+            # Another caller may have refreshed it while we waited
+            schema_info = self._fresh_schema_cache()
+            if schema_info is not None:
+                return schema_info
+            
+            # On a cold start, reuse the schema persisted by a previous
+            # process; later expiries always fetch live, so a long-running
+            # process sees schema changes within 5 minutes
+            if self.schema_cache is None:
+                schema_info = self._read_schema_cache_file()
+            
+            if schema_info is None:
+                # Fetch fresh schema (use configured schema if available)
+                logger.info(
+                    f"Fetching database schema for schema: "
+                    f"{Config.REDSHIFT_SCHEMA}"
+                )
+                schema_info = self.redshift_client.get_schema(
+                    target_schema=Config.REDSHIFT_SCHEMA
+                )
+                if schema_info.get('tables'):
+                    self._write_schema_cache_file(schema_info)
+            
+            self.schema_cache = schema_info
+            self.schema_cache_time = time.time()
+            
+            return self.schema_cache
+    
+    def _fresh_schema_cache(self) -> Optional[Dict[str, Any]]:
+        """
+        Get the in-memory schema if it is younger than 5 minutes.
+        
+        Returns:
+            Cached schema information, or None if missing or stale
+        """
         # Cache schema for 5 minutes to reduce database queries
-        current_time = time.time()
         cache_duration = 300  # 5 minutes
         
         if (
             self.schema_cache is not None
             and self.schema_cache_time is not None
-            and (current_time - self.schema_cache_time) < cache_duration
+            and (time.time() - self.schema_cache_time) < cache_duration
         ):
-            logger.debug("Using cached schema information")
             return self.schema_cache
+        return None
+    
+    @staticmethod
+    def _schema_cache_file() -> str:
+        """
+        Get the on-disk schema cache path for the configured database.
         
-        # Fetch fresh schema (use configured schema if available)
-        logger.info(
-            f"Fetching database schema for schema: "
-            f"{Config.REDSHIFT_SCHEMA}"
-        )
-        self.schema_cache = self.redshift_client.get_schema(
-            target_schema=Config.REDSHIFT_SCHEMA
+        Returns:
+            str: Path keyed by a hash of host, database and schema
+        """
+        key = hashlib.sha1(
+            f"{Config.REDSHIFT_HOST}|{Config.REDSHIFT_DATABASE}|"
+            f"{Config.REDSHIFT_SCHEMA}".encode()
+        ).hexdigest()[:16]
+        return os.path.join(
+            Config.SCHEMA_CACHE_DIR,
+            f"finchat-schema-{key}.json"
         )
-        self.schema_cache_time = current_time
+    
+    def _read_schema_cache_file(self) -> Optional[Dict[str, Any]]:
+        """
+        Read the persisted schema if younger than SCHEMA_CACHE_DISK_TTL.
         
-        return self.schema_cache
+        The file is only trusted if it is a regular file owned by this
+        user and not writable by anyone else, since it may live in a
+        shared directory and its contents go into the model prompt.
+        
+        Returns:
+            Schema information, or None on miss/expiry
+        """
+        path = self._schema_cache_file()
+        try:
+            fd = os.open(path, os.O_RDONLY | os.O_NOFOLLOW)
+        except OSError:
+            return None
+        
+        try:
+            st = os.fstat(fd)
+            if (
+                not stat.S_ISREG(st.st_mode)
+                or st.st_uid != os.getuid()
+                or st.st_mode & 0o077
+                or time.time() - st.st_mtime > Config.SCHEMA_CACHE_DISK_TTL
+            ):
+                return None
+            with os.fdopen(fd, 'r') as f:
+                fd = None
+                schema_info = json.load(f)
+        except (OSError, ValueError):
+            return None
+        finally:
+            if fd is not None:
+                os.close(fd)
+        
+        logger.info(f"Loaded database schema from {path}")
+        return schema_info
+    
+    def _write_schema_cache_file(self, schema_info: Dict[str, Any]) -> None:
+        """
+        Persist schema information for reuse across restarts (0600).
+        
+        The schema is written to a new private file and renamed into
+        place, so an existing file owned by someone else is never
+        written to.
+        
+        Args:
+            schema_info: Schema information to store
+        """
+        path = self._schema_cache_file()
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            fd = os.open(
+                tmp_path,
+                os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_NOFOLLOW,
+                0o600
+            )
+        except OSError as e:
+            logger.warning(f"Could not write schema cache: {e}")
+            return
+        
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(schema_info, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write schema cache: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
     
     def test_connections(self) -> Dict[str, bool]:
         """
@@ -177,10 +425,32 @@ class QueryGenerator:
         Returns:
             Dictionary with connection status for each service
         """
-        return {
-            'bedrock': self.bedrock_client.test_connection(),
-            'redshift': self.redshift_client.test_connection()
+        # Probe both services concurrently so a slow one doesn't delay
+        # the other; a probe that misses the deadline counts as failed.
+        # A probe still running from an earlier call is waited on again
+        # rather than starting another one behind it.
+        probes = {
+            'bedrock': self.bedrock_client.test_connection,
+            'redshift': self.redshift_client.test_connection
         }
+        futures = {}
+        with self._probe_lock:
+            for service, probe in probes.items():
+                future = self._probes.get(service)
+                if future is None or future.done():
+                    future = _prefetch_executor.submit(probe)
+                    self._probes[service] = future
+                futures[service] = future
+        wait(futures.values(), timeout=Config.HEALTH_TIMEOUT)
+        
+        status = {}
+        for service, future in futures.items():
+            if future.done() and not future.exception():
+                status[service] = bool(future.result())
+            else:
+                logger.warning(f"{service} connection test did not complete")
+                status[service] = False
+        return status
     
     def get_schema(self) -> Dict[str, Any]:
         """
@@ -3,16 +3,28 @@ AWS RedShift client for database operations.
 """
 
 import logging
+import threading
+from itertools import groupby
+from operator import itemgetter
 from typing import List, Dict, Any, Tuple
 import psycopg2
-from psycopg2 import pool
-from psycopg2.extras import RealDictCursor
 
 from config import Config
-from .utils import validate_sql_safety
+from .utils import (
+    apply_row_limit,
+    format_query_results,
+    validate_sql_safety
+)
 
 logger = logging.getLogger(__name__)
 
+# Caps connections checked out of the shared pool, so callers wait for a
+# free connection instead of getconn() raising PoolError when exhausted
+_pool_slots = threading.BoundedSemaphore(Config.REDSHIFT_POOL_MAX)
+
+# Internal metadata queries that skip the read-only safety validation
+_SCHEMA_PREFIXES = ('SELECT TABLE_SCHEMA', 'SELECT COLUMN_NAME')
+
 
 class RedShiftClient:
     """Client for AWS RedShift database operations."""
@@ -24,43 +36,23 @@ class RedShiftClient:
     
     def _initialize_connection_pool(self):
         """
-        Initialize database connection pool.
+        Attach to the shared database connection pool.
         
         Raises:
             Exception: If connection pool creation fails
         """
         try:
-            self.connection_pool = pool.SimpleConnectionPool(
-                minconn=1,
-                maxconn=10,
-                **self._get_connection_params()
-            )
+            self.connection_pool = Config.get_redshift_pool()
             logger.info("RedShift connection pool initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize connection pool: {e}")
             self.connection_pool = None
             # Don't raise - allow app to start with degraded functionality
     
-    def _get_connection_params(self) -> Dict[str, Any]:
-        """
-        Get connection parameters as dictionary.
-        
-        Returns:
-            dict: Connection parameters
-        """
-        return {
-            'host': Config.REDSHIFT_HOST,
-            'port': Config.REDSHIFT_PORT,
-            'database': Config.REDSHIFT_DATABASE,
-            'user': Config.REDSHIFT_USER,
-            'password': Config.REDSHIFT_PASSWORD,
-            'sslmode': 'require' if Config.REDSHIFT_SSL else 'prefer',
-            'connect_timeout': 10,
-        }
-    
     def get_connection(self):
         """
-        Get a connection from the pool.
+        Get a connection from the pool, waiting up to MAX_QUERY_TIMEOUT
+        seconds if all REDSHIFT_POOL_MAX connections are in use.
         
         Returns:
             Connection object
@@ -70,9 +62,12 @@ class RedShiftClient:
         """
         if not self.connection_pool:
             raise Exception("Connection pool not initialized")
+        if not _pool_slots.acquire(timeout=Config.MAX_QUERY_TIMEOUT):
+            raise Exception("Timed out waiting for a database connection")
         try:
             return self.connection_pool.getconn()
         except Exception as e:
+            _pool_slots.release()
             logger.error(f"Failed to get connection from pool: {e}")
             raise
     
@@ -84,13 +79,17 @@ class RedShiftClient:
             conn: Connection object to return
         """
         if conn:
-            self.connection_pool.putconn(conn)
+            try:
+                self.connection_pool.putconn(conn)
+            finally:
+                _pool_slots.release()
     
     def execute_query(
         self,
         sql: str,
         params: Tuple = None,
-        timeout_seconds: int = None
+        timeout_seconds: int = None,
+        limit_rows: bool = True
     ) -> List[Dict[str, Any]]:
         """
         Execute SQL query and return results.
@@ -99,6 +98,8 @@ class RedShiftClient:
             sql: SQL query string
             params: Optional query parameters
             timeout_seconds: Optional timeout override
+            limit_rows: Whether to cap results at MAX_RESULT_ROWS
+                (disabled for internal metadata queries)
             
         Returns:
             List of dictionaries containing query results
@@ -109,22 +110,31 @@ class RedShiftClient:
         """
         # Validate SQL safety for user queries (skip for schema queries)
         # Skip validation for schema information queries
-        schema_prefixes = ('SELECT TABLE_SCHEMA', 'SELECT COLUMN_NAME')
-        if not sql.strip().upper().startswith(schema_prefixes):
+        # Only the head of the query is uppercased for the prefix check
+        head = sql.lstrip()[:20].upper()
+        if not head.startswith(_SCHEMA_PREFIXES):
             is_safe, error_msg = validate_sql_safety(sql)
             if not is_safe:
                 raise ValueError(f"Unsafe SQL query: {error_msg}")
         
+        # Let RedShift stop at the cap (one extra row detects truncation)
+        if limit_rows:
+            sql = apply_row_limit(sql, Config.MAX_RESULT_ROWS + 1)
+        
         conn = None
         cursor = None
         
         try:
             conn = self.get_connection()
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
             
-            # Set query timeout (use override or default)
-            timeout_ms = (timeout_seconds or Config.MAX_QUERY_TIMEOUT) * 1000
-            cursor.execute(f"SET statement_timeout = {timeout_ms}")
+            # The default timeout is set when the connection is opened;
+            # overrides only last for this transaction, which is rolled
+            # back when the connection returns to the pool
+            cursor = conn.cursor()
+            if timeout_seconds and timeout_seconds != Config.MAX_QUERY_TIMEOUT:
+                cursor.execute(
+                    f"SET LOCAL statement_timeout = {timeout_seconds * 1000}"
+                )
             
             # Execute query
             if params:
@@ -132,16 +142,22 @@ class RedShiftClient:
             else:
                 cursor.execute(sql)
             
-            # Fetch results
-            results = cursor.fetchall()
+            # Fetch results. The client cursor has already transferred
+            # the whole result set, so the row cap comes from the
+            # LIMIT/TOP set by apply_row_limit; fetchmany() only saves
+            # converting rows that would be dropped below
+            if limit_rows:
+                results = cursor.fetchmany(Config.MAX_RESULT_ROWS + 1)
+            else:
+                results = cursor.fetchall()
             
-            # Convert RealDictRow to regular dict
-            results_list = [dict(row) for row in results]
+            # Build dicts from plain tuples, resolving column names once
+            results_list = format_query_results(results, cursor.description)
             
             # Limit results
-            if len(results_list) > Config.MAX_RESULT_ROWS:
+            if limit_rows and len(results_list) > Config.MAX_RESULT_ROWS:
                 logger.warning(
-                    f"Query returned {len(results_list)} rows, "
+                    f"Query returned more than {Config.MAX_RESULT_ROWS} rows, "
                     f"limiting to {Config.MAX_RESULT_ROWS}"
                 )
                 results_list = results_list[:Config.MAX_RESULT_ROWS]
@@ -210,39 +226,55 @@ class RedShiftClient:
                 """
                 tables = self.execute_query(tables_sql, timeout_seconds=120)
             
-            # For each table, get column information
-            for table in tables:
-                table_schema = table['table_schema']
-                table_name = table['table_name']
-                full_table_name = f"{table_schema}.{table_name}"
-                
-                columns_sql = """
-                    SELECT
-                        column_name,
-                        data_type,
-                        is_nullable
-                    FROM information_schema.columns
-                    WHERE table_schema = %s
-                        AND table_name = %s
-                    ORDER BY ordinal_position
-                """
-                
-                columns = self.execute_query(
-                    columns_sql, 
-                    (table_schema, table_name),
-                    timeout_seconds=120
-                )
-                
-                schema_info['tables'].append({
-                    'name': full_table_name,
-                    'columns': [
+            if not tables:
+                logger.info("Retrieved schema for 0 tables")
+                return schema_info
+            
+            # Fetch columns for all tables in one round-trip, then keep
+            # only the exact (schema, table) pairs selected above
+            wanted = {(t['table_schema'], t['table_name']) for t in tables}
+            columns_sql = """
+                SELECT
+                    table_schema,
+                    table_name,
+                    column_name,
+                    data_type,
+                    is_nullable
+                FROM information_schema.columns
+                WHERE table_schema IN %s
+                    AND table_name IN %s
+                ORDER BY table_schema, table_name, ordinal_position
+            """
+            columns = self.execute_query(
+                columns_sql,
+                (
+                    tuple({schema for schema, _ in wanted}),
+                    tuple({name for _, name in wanted})
+                ),
+                timeout_seconds=120,
+                limit_rows=False
+            )
+            
+            columns_by_table = {}
+            for key, group in groupby(
+                columns,
+                key=itemgetter('table_schema', 'table_name')
+            ):
+                if key in wanted:
+                    columns_by_table[key] = [
                         {
                             'name': col['column_name'],
                             'type': col['data_type'],
                             'nullable': col['is_nullable'] == 'YES'
                         }
-                        for col in columns
+                        for col in group
                     ]
+            
+            for table in tables:
+                key = (table['table_schema'], table['table_name'])
+                schema_info['tables'].append({
+                    'name': f"{key[0]}.{key[1]}",
+                    'columns': columns_by_table.get(key, [])
                 })
             
             logger.info(
@@ -273,5 +305,6 @@ class RedShiftClient:
     def close(self):
         """Close all connections in the pool."""
         if self.connection_pool:
-            self.connection_pool.closeall()
+            Config.close_redshift_pool()
+            self.connection_pool = None
             logger.info("RedShift connection pool closed")
\ No newline at end of file
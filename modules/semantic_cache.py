@@ -0,0 +1,75 @@
+"""
+Semantic response cache keyed by question embeddings.
+"""
+
+import logging
+import operator
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticCache:
+    """
+    In-process cache that matches questions by embedding similarity.
+    
+    Embeddings are expected to be unit-normalized, so the dot product is
+    the cosine similarity. Lookups are a linear scan, which is adequate
+    for the few hundred entries this cache is sized for.
+    """
+    
+    def __init__(self, threshold: float, ttl: float, max_entries: int):
+        """
+        Initialize an empty semantic cache.
+        
+        Args:
+            threshold: Minimum cosine similarity for a hit
+            ttl: Seconds before an entry expires
+            max_entries: Maximum number of entries kept (oldest evicted)
+        """
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = []  # (expires_at, embedding, result)
+        self._lock = threading.Lock()
+    
+    def lookup(self, embedding: List[float]) -> Optional[Dict[str, Any]]:
+        """
+        Find the cached result for the most similar question.
+        
+        Args:
+            embedding: Normalized embedding of the user question
+        
+        Returns:
+            Cached result dictionary, or None if nothing is similar enough
+        """
+        now = time.time()
+        best_score = self.threshold
+        best_result = None
+        
+        with self._lock:
+            self._entries = [e for e in self._entries if e[0] > now]
+            for _, cached_embedding, result in self._entries:
+                score = sum(map(operator.mul, embedding, cached_embedding))
+                if score >= best_score:
+                    best_score = score
+                    best_result = result
+        
+        if best_result is not None:
+            logger.info(f"Semantic cache hit (similarity {best_score:.3f})")
+        return best_result
+    
+    def add(self, embedding: List[float], result: Dict[str, Any]) -> None:
+        """
+        Store a result for a question embedding.
+        
+        Args:
+            embedding: Normalized embedding of the user question
+            result: Result dictionary to return on future hits
+        """
+        with self._lock:
+            self._entries.append((time.time() + self.ttl, embedding, result))
+            if len(self._entries) > self.max_entries:
+                del self._entries[:len(self._entries) - self.max_entries]
@@ -2,10 +2,17 @@
 Utility functions for RedShift Chatbot application.
 """
 
+import atexit
 import logging
+import queue
+import time
 import uuid
 import re
-from typing import List, Dict, Any, Tuple
+import threading
+from itertools import islice
+from logging.handlers import QueueHandler, QueueListener
+from operator import itemgetter
+from typing import List, Dict, Any, Iterable, Iterator, Tuple
 from datetime import datetime
 
 # Configure logging
@@ -16,6 +23,105 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+class _DroppingQueueHandler(QueueHandler):
+    """Queue handler that drops (and counts) records when the queue is full."""
+    
+    dropped = 0
+    
+    def enqueue(self, record):
+        """Enqueue without blocking; drop the record if the queue is full."""
+        _start_log_listener()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _DroppingQueueHandler.dropped += 1
+
+
+class _RootForwardingHandler(logging.Handler):
+    """Pass records to whatever handlers the root logger has at emit time."""
+    
+    def emit(self, record):
+        """Forward the record to the root logger's handlers."""
+        logging.getLogger().handle(record)
+
+
+def _start_log_listener() -> None:
+    """Start the background log listener on first use."""
+    global _log_listener_started
+    if _log_listener_started:
+        return
+    with _log_listener_lock:
+        if not _log_listener_started:
+            _log_listener.start()
+            atexit.register(_log_listener.stop)
+            _log_listener_started = True
+
+
+# Hand this module's records (error bursts from log_error) to a background
+# listener, so request threads only pay for an enqueue. The listener
+# forwards to the root logger, so handlers configured later (gunicorn
+# --log-config, file or CloudWatch handlers) still receive them.
+_log_queue = queue.Queue(maxsize=10000)
+_log_listener = QueueListener(_log_queue, _RootForwardingHandler())
+_log_listener_lock = threading.Lock()
+_log_listener_started = False
+logger.addHandler(_DroppingQueueHandler(_log_queue))
+logger.propagate = False
+
+# Dangerous keywords that should be blocked, folded into one pattern
+DANGEROUS_SQL_KEYWORDS = (
+    'DROP', 'DELETE', 'INSERT', 'UPDATE',
+    'ALTER', 'CREATE', 'TRUNCATE', 'GRANT',
+    'REVOKE', 'EXEC', 'EXECUTE'
+)
+_DANGEROUS_SQL_RE = re.compile(
+    r'\b(' + '|'.join(DANGEROUS_SQL_KEYWORDS) + r')\b',
+    re.IGNORECASE
+)
+
+# SQL comments stripped by sanitize_sql()
+_LINE_COMMENT_RE = re.compile(r'--.*$', re.MULTILINE)
+_BLOCK_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+
+# Map technical errors to user-friendly messages (format_error_message)
+_FRIENDLY_ERROR_MESSAGES = {
+    'OperationalError': (
+        'Database connection error. '
+        'Please check your connection settings.'
+    ),
+    'ProgrammingError': (
+        'Invalid SQL query generated. '
+        'Please try rephrasing your question.'
+    ),
+    'TimeoutError': (
+        'Query took too long to execute. '
+        'Please try a more specific question.'
+    ),
+}
+_DEFAULT_ERROR_MESSAGE = (
+    'An error occurred while processing your request. '
+    'Please try again.'
+)
+
+# Row limit already present at the end of a query
+_TRAILING_LIMIT_RE = re.compile(
+    r'\bLIMIT\s+(\d+|ALL)(\s+OFFSET\s+\d+)?$',
+    re.IGNORECASE
+)
+
+# RedShift SELECT TOP n / SELECT DISTINCT TOP n, which can't take a LIMIT
+_SELECT_TOP_RE = re.compile(
+    r'^(SELECT\s+(?:(?:ALL|DISTINCT)\s+)?TOP\b)\s*(\d+)?',
+    re.IGNORECASE
+)
+
+# Last (epoch second, ISO string) pair produced by now_iso()
+_last_ts = [0, '']
+
+# Last (epoch second, ISO prefix without fraction) pair for error logs
+_last_log_ts = [0, '']
+
+
 def format_query_results(
     results: List[Tuple],
     description: List[Tuple]
@@ -37,14 +143,114 @@ def format_query_results(
     return [dict(zip(columns, row)) for row in results]
 
 
+def iter_query_results(
+    results: Iterable[Tuple],
+    description: List[Tuple]
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily convert database results to dictionaries, one row at a time.
+    
+    Args:
+        results: Iterable of tuples from database query (e.g. a cursor)
+        description: Cursor description with column information
+        
+    Yields:
+        Dictionary for each row with column names as keys
+    """
+    columns = [desc[0] for desc in description]
+    for row in results:
+        yield dict(zip(columns, row))
+
+
+def format_query_results_batched(
+    results: Iterable[Tuple],
+    description: List[Tuple],
+    batch_size: int = 1000
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Convert database results to lists of dictionaries in fixed-size batches.
+    
+    Args:
+        results: Iterable of tuples from database query (e.g. a cursor)
+        description: Cursor description with column information
+        batch_size: Maximum number of rows per batch
+        
+    Yields:
+        List of up to batch_size row dictionaries
+    """
+    rows = iter_query_results(results, description)
+    batch = list(islice(rows, batch_size))
+    while batch:
+        yield batch
+        batch = list(islice(rows, batch_size))
+
+
+def format_query_results_columnar(
+    results: List[Tuple],
+    description: List[Tuple]
+) -> Dict[str, List[Any]]:
+    """
+    Convert database results to column-oriented format.
+    
+    Each column's values are extracted with operator.itemgetter, so the
+    per-row loop runs in C and no per-row dict is built.
+    
+    Args:
+        results: List of tuples from database query
+        description: Cursor description with column information
+        
+    Returns:
+        Dictionary mapping each column name to its list of values
+    """
+    return {
+        desc[0]: list(map(itemgetter(i), results))
+        for i, desc in enumerate(description)
+    }
+
+
 def generate_conversation_id() -> str:
     """
     Generate a unique conversation ID.
     
     Returns:
-        str: UUID string for conversation tracking
+        str: 32-character hex UUID4 for conversation tracking
+    """
+    return uuid.uuid4().hex
+
+
+def now_iso() -> str:
+    """
+    Get the current UTC time as an ISO 8601 string at 1 s resolution.
+    
+    The formatted string is cached and only rebuilt when the second
+    changes, keeping datetime construction off the per-request path.
+    
+    Returns:
+        str: Timestamp such as '2024-01-20T10:30:00Z'
     """
-    return str(uuid.uuid4())
+    t = int(time.time())
+    if t != _last_ts[0]:
+        _last_ts[0] = t
+        _last_ts[1] = datetime.utcfromtimestamp(t).isoformat() + 'Z'
+    return _last_ts[1]
+
+
+def normalize_question(text: str) -> str:
+    """
+    Canonicalize a user question for cache lookups.
+    
+    Lowercases, collapses whitespace and strips trailing sentence
+    punctuation (?.!) so trivial variants of the same question map to
+    one key. Other punctuation (e.g. <, >, =, -, %, $ or a decimal
+    point) can change the meaning and is kept.
+    
+    Args:
+        text: User's natural language question
+        
+    Returns:
+        str: Normalized question text
+    """
+    return ' '.join(text.lower().split()).rstrip('?.! ')
 
 
 def sanitize_sql(sql: str) -> str:
@@ -58,10 +264,10 @@ def sanitize_sql(sql: str) -> str:
         str: Sanitized SQL query
     """
     # Remove SQL comments (-- style)
-    sql = re.sub(r'--.*$', '', sql, flags=re.MULTILINE)
+    sql = _LINE_COMMENT_RE.sub('', sql)
     
     # Remove SQL comments (/* */ style)
-    sql = re.sub(r'/\*.*?\*/', '', sql, flags=re.DOTALL)
+    sql = _BLOCK_COMMENT_RE.sub('', sql)
     
     # Remove extra whitespace
     sql = ' '.join(sql.split())
@@ -79,22 +285,14 @@ def validate_sql_safety(sql: str) -> Tuple[bool, str]:
     Returns:
         Tuple of (is_valid, error_message)
     """
-    sql_upper = sql.upper()
-    
-    # Dangerous keywords that should be blocked
-    dangerous_keywords = [
-        'DROP', 'DELETE', 'INSERT', 'UPDATE',
-        'ALTER', 'CREATE', 'TRUNCATE', 'GRANT',
-        'REVOKE', 'EXEC', 'EXECUTE'
-    ]
+    # Single pass over the query for any dangerous keyword as a whole word
+    match = _DANGEROUS_SQL_RE.search(sql)
+    if match:
+        keyword = match.group(1).upper()
+        return False, f"Dangerous SQL keyword detected: {keyword}"
     
-    for keyword in dangerous_keywords:
-        # Check for keyword as a whole word
-        if re.search(r'\b' + keyword + r'\b', sql_upper):
-            return False, f"Dangerous SQL keyword detected: {keyword}"
-    
-    # Must start with SELECT
-    if not sql_upper.strip().startswith('SELECT'):
+    # Must start with SELECT (only the first word is uppercased)
+    if sql.lstrip()[:6].upper() != 'SELECT':
         return False, "Query must start with SELECT"
     
     # Check for multiple statements (semicolons)
@@ -108,26 +306,141 @@ def validate_sql_safety(sql: str) -> Tuple[bool, str]:
     return True, ""
 
 
-def log_error(error: Exception, context: Dict[str, Any] = None) -> None:
+def apply_row_limit(sql: str, max_rows: int) -> str:
     """
-    Log error with context information.
+    Cap the rows a SELECT query can return at max_rows.
+    
+    Pushing the row cap into the query lets RedShift stop producing rows
+    early instead of transferring them all to the client. A trailing
+    LIMIT n or SELECT [DISTINCT] TOP n is lowered to max_rows if larger,
+    LIMIT ALL is replaced, and otherwise a LIMIT is appended.
+    
+    Args:
+        sql: SQL query string
+        max_rows: Row limit to apply
+        
+    Returns:
+        str: Row-capped query, or the original query if it already
+            returns at most max_rows, isn't a SELECT, or contains line
+            comments
+    """
+    stripped = sql.strip().rstrip(';').rstrip()
+    
+    if stripped[:6].upper() != 'SELECT' or '--' in stripped:
+        return sql
+    
+    top = _SELECT_TOP_RE.match(stripped)
+    if top:
+        if top.group(2) is None or int(top.group(2)) <= max_rows:
+            return sql
+        return f"{top.group(1)} {max_rows}{stripped[top.end():]}"
+    
+    limit = _TRAILING_LIMIT_RE.search(stripped)
+    if limit:
+        count = limit.group(1)
+        if count.isdigit() and int(count) <= max_rows:
+            return sql
+        offset = limit.group(2) or ''
+        return f"{stripped[:limit.start()]}LIMIT {max_rows}{offset}"
+    
+    return f"{stripped} LIMIT {max_rows}"
+
+
+def _utc_iso_us() -> str:
+    """
+    Get the current UTC time as an ISO 8601 string with microseconds.
+    
+    The second-resolution prefix is cached, so only the fraction is
+    formatted on each call.
+    
+    Returns:
+        str: Timestamp such as '2024-01-20T10:30:00.123456'
+    """
+    ns = time.time_ns()
+    sec = ns // 1_000_000_000
+    if sec != _last_log_ts[0]:
+        _last_log_ts[0] = sec
+        _last_log_ts[1] = datetime.utcfromtimestamp(sec).isoformat()
+    return f"{_last_log_ts[1]}.{ns // 1000 % 1_000_000:06d}"
+
+
+def error_key(error: Exception) -> str:
+    """
+    Get the key used to classify an error (its class name).
+    
+    Args:
+        error: Exception object
+        
+    Returns:
+        str: Exception class name, e.g. 'OperationalError'
+    """
+    return type(error).__name__
+
+
+def _error_info(
+    error: Exception,
+    context: Dict[str, Any] = None,
+    error_type: str = None
+) -> Dict[str, Any]:
+    """
+    Build the structured record logged for an error.
     
     Args:
         error: Exception object
         context: Additional context information
+        error_type: Precomputed error_key(error), if already known
+        
+    Returns:
+        Dictionary with error type, message, timestamp and context
     """
     error_info = {
-        'error_type': type(error).__name__,
+        'error_type': error_type or error_key(error),
         'error_message': str(error),
-        'timestamp': datetime.utcnow().isoformat(),
+        'timestamp': _utc_iso_us(),
     }
     
     if context:
         error_info['context'] = context
     
+    return error_info
+
+
+def log_error(
+    error: Exception,
+    context: Dict[str, Any] = None,
+    error_type: str = None
+) -> None:
+    """
+    Log error with context information.
+    
+    Args:
+        error: Exception object
+        context: Additional context information
+        error_type: Precomputed error_key(error), if already known
+    """
+    error_info = _error_info(error, context, error_type)
     logger.error(f"Error occurred: {error_info}")
 
 
+def log_errors_batch(
+    errors: List[Tuple[Exception, Dict[str, Any]]]
+) -> None:
+    """
+    Log several errors as a single log record.
+    
+    Args:
+        errors: List of (error, context) pairs; context may be None
+    """
+    if not errors:
+        return
+    
+    lines = [
+        f"Error occurred: {_error_info(error, context)}"
+        for error, context in errors
+    ]
+    logger.error('\n'.join(lines))
+
+
 def format_execution_time(seconds: float) -> str:
     """
     Format execution time in human-readable format.
@@ -139,13 +452,13 @@ def format_execution_time(seconds: float) -> str:
         str: Formatted time string
     """
     if seconds < 1:
-        return f"{seconds * 1000:.0f}ms"
+        # round() to an int matches :.0f without the float formatter
+        return f"{round(seconds * 1000)}ms"
     elif seconds < 60:
         return f"{seconds:.2f}s"
     else:
-        minutes = int(seconds // 60)
-        secs = seconds % 60
-        return f"{minutes}m {secs:.2f}s"
+        minutes, secs = divmod(seconds, 60)
+        return f"{int(minutes)}m {secs:.2f}s"
 
 
 def truncate_results(
@@ -166,40 +479,46 @@ def truncate_results(
     return results[:max_rows], was_truncated
 
 
-def format_error_message(error: Exception, user_friendly: bool = True) -> str:
+def truncate_results_view(
+    results: List[Dict[str, Any]],
+    max_rows: int
+) -> Tuple[Iterator[Dict[str, Any]], bool]:
+    """
+    Truncate results to maximum number of rows without copying.
+    
+    Use truncate_results() instead when a real list is needed
+    (e.g. for JSON serialization).
+    
+    Args:
+        results: List of result dictionaries
+        max_rows: Maximum number of rows to return
+        
+    Returns:
+        Tuple of (iterator over the first max_rows results, was_truncated)
+    """
+    return islice(results, max_rows), len(results) > max_rows
+
+
+def format_error_message(
+    error: Exception,
+    user_friendly: bool = True,
+    error_type: str = None
+) -> str:
     """
     Format error message for display.
     
     Args:
         error: Exception object
         user_friendly: Whether to return user-friendly message
+        error_type: Precomputed error_key(error), if already known
         
     Returns:
         str: Formatted error message
     """
     if user_friendly:
-        error_type = type(error).__name__
-        
-        # Map technical errors to user-friendly messages
-        friendly_messages = {
-            'OperationalError': (
-                'Database connection error. '
-                'Please check your connection settings.'
-            ),
-            'ProgrammingError': (
-                'Invalid SQL query generated. '
-                'Please try rephrasing your question.'
-            ),
-            'TimeoutError': (
-                'Query took too long to execute. '
-                'Please try a more specific question.'
-            ),
-        }
-        
-        return friendly_messages.get(
-            error_type,
-            'An error occurred while processing your request. '
-            'Please try again.'
+        return _FRIENDLY_ERROR_MESSAGES.get(
+            error_type or error_key(error),
+            _DEFAULT_ERROR_MESSAGE
         )
     else:
         return str(error)
\ No newline at end of file
@@ -3,7 +3,9 @@
 Validate RedShift Chatbot setup and configuration.
 """
 
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 
@@ -23,13 +25,21 @@ def check_env_file():
         'REDSHIFT_PASSWORD'
     ]
     
+    # Parse the file once into the set of keys with real values; a later
+    # assignment of the same key overrides an earlier one
+    configured = set()
     with open('.env', 'r') as f:
-        env_content = f.read()
+        for line in f:
+            key, sep, value = line.partition('=')
+            key = key.strip().removeprefix('export ').strip()
+            if not sep or key.startswith('#'):
+                continue
+            if value.strip().startswith('your_'):
+                configured.discard(key)
+            else:
+                configured.add(key)
     
-    missing_vars = []
-    for var in required_vars:
-        if var not in env_content or f'{var}=your_' in env_content:
-            missing_vars.append(var)
+    missing_vars = [var for var in required_vars if var not in configured]
     
     if missing_vars:
         print(
@@ -57,6 +67,15 @@ def check_python_version():
     return True
 
 
+def _try_import(package):
+    """Import a package by name, returning (package, imported_ok)."""
+    try:
+        __import__(package.replace('-', '_'))
+        return package, True
+    except ImportError:
+        return package, False
+
+
 def check_dependencies():
     """Check if required Python packages are installed."""
     required_packages = [
@@ -66,12 +85,11 @@ def check_dependencies():
         'dotenv'
     ]
     
-    missing = []
-    for package in required_packages:
-        try:
-            __import__(package.replace('-', '_'))
-        except ImportError:
-            missing.append(package)
+    # Import concurrently so the packages' load times overlap
+    with ThreadPoolExecutor(max_workers=len(required_packages)) as executor:
+        results = list(executor.map(_try_import, required_packages))
+    
+    missing = [package for package, ok in results if not ok]
     
     if missing:
         print(f"❌ Missing packages: {', '.join(missing)}")
@@ -93,10 +111,12 @@ def check_project_structure():
         'requirements.txt'
     ]
     
-    missing = []
-    for path in required_paths:
-        if not Path(path).exists():
-            missing.append(path)
+    # All required paths are top-level, so one directory read covers them
+    entries = set(os.listdir('.'))
+    missing = [
+        path for path in required_paths
+        if path.rstrip('/') not in entries
+    ]
     
     if missing:
         print(f"❌ Missing files/directories: {', '.join(missing)}")
@@ -0,0 +1,19 @@
+"""
+WSGI entry point for running RedShift Chatbot under gunicorn + gevent.
+
+Usage:
+    gunicorn -k gevent -w 5 --worker-connections 200 wsgi:app
+"""
+
+# Monkey-patching must happen before any other import so that socket,
+# ssl and requests/urllib3 (used by boto3) become cooperative.
+from gevent import monkey
+monkey.patch_all()
+
+# Make psycopg2 yield to the gevent loop while waiting on RedShift
+from psycogreen.gevent import patch_psycopg
+patch_psycopg()
+
+from app import app  # noqa: E402
+
+__all__ = ['app']